@@ -15,29 +15,31 @@ UI: http://127.0.0.1:8765/chat
 """
 
 import os
-import smtplib
-import subprocess
 import sys
 import threading
 from datetime import date
 from pathlib import Path
 
-from dotenv import load_dotenv
 from flask import Flask
 
+from helpers.env import load_env
+from helpers.seq import allocate_sequence
+from helpers.spawn import spawn_background
 from meta.log import log_history_record
+from bob.config import get_openai_client
 from bob.schema import BOB_PLAN_SCHEMA  # noqa: F401  (exported for tests/introspection)
 from bob.planner import bob_build_plan, bob_refine_codemod_with_files
 from bob.chat import bob_simple_chat, bob_answer_with_context
 from chad.executor import chad_execute_plan as _chad_execute_plan
-from web.chat import create_chat_blueprint
+from web.chat import ChatDeps, create_chat_blueprint
 from meta.web import  meta_bp
 
 # ---------------------------------------------------------------------------
 # Env
 # ---------------------------------------------------------------------------
 
-load_dotenv()
+load_env()
+
 
 # ---------------------------------------------------------------------------
 # Paths / constants
@@ -54,8 +56,29 @@ MARKDOWN_NOTES_DIR = DATA_ROOT / "notes"
 UI_ROOT = AI_ROOT / "ui"
 CHAT_TEMPLATE_PATH = UI_ROOT / "chat_ui.html"
 
-for d in (DATA_ROOT, QUEUE_DIR, SCRATCH_DIR, MARKDOWN_NOTES_DIR, UI_ROOT):
-    d.mkdir(parents=True, exist_ok=True)
+
+def _ensure_dirs() -> None:
+    """
+    Create any missing data/UI dirs. One scandir of DATA_ROOT tells us which
+    children already exist, so a warm start costs two syscalls rather than a
+    mkdir (+ stat on EEXIST) per directory.
+    """
+    try:
+        with os.scandir(DATA_ROOT) as it:
+            existing = {entry.name for entry in it}
+    except FileNotFoundError:
+        DATA_ROOT.mkdir(parents=True, exist_ok=True)
+        existing = set()
+
+    for d in (QUEUE_DIR, SCRATCH_DIR, MARKDOWN_NOTES_DIR):
+        if d.name not in existing:
+            d.mkdir(exist_ok=True)
+
+    if not UI_ROOT.is_dir():
+        UI_ROOT.mkdir(parents=True, exist_ok=True)
+
+
+_ensure_dirs()
 
 # Project jail – Bob/Chad only touch files inside here
 ENV_PROJECT_JAIL = os.getenv("ENV_PROJECT_JAIL")
@@ -69,29 +92,75 @@ else:
 # Auto-repair helper
 # ---------------------------------------------------------------------------
 
+# At most one repair child runs at a time. Requests that arrive while it is
+# running collapse into a single follow-up run once it exits, so a burst of
+# failures launches two interpreters, not one per failure.
+_repair_lock = threading.Lock()
+_repair_running = False
+_repair_pending = False
+
+
 def _auto_repair_then_retry_async() -> None:
     """
     Fire-and-forget: run `python3 -m meta repair_then_retry` in the
     background so Bob/Chad can self-repair and retry the last failed job.
-    """
 
-    def _run() -> None:
-        try:
-            subprocess.run(
-                [sys.executable, "-m", "meta", "repair_then_retry"],
-                cwd=str(AI_ROOT),
-                check=False,
-            )
-        except Exception as e:
-            print(f"[Bob/Chad] auto repair_then_retry crashed: {e!r}")
-
-    threading.Thread(target=_run, daemon=True).start()
+    The child is reaped by helpers.spawn's shared reaper, so no thread is
+    parked per repair run.
+    """
+    global _repair_running, _repair_pending
+    with _repair_lock:
+        if _repair_running:
+            _repair_pending = True
+            return
+        _repair_running = True
+    _launch_repair()
+
+
+def _launch_repair() -> None:
+    global _repair_running
+    try:
+        spawn_background(
+            [sys.executable, "-m", "meta", "repair_then_retry"],
+            AI_ROOT,
+            on_exit=_on_repair_exit,
+        )
+    except Exception as e:
+        print(f"[Bob/Chad] auto repair_then_retry crashed: {e!r}")
+        with _repair_lock:
+            _repair_running = False
+
+
+def _on_repair_exit(_proc) -> None:
+    """Reaper callback: start the coalesced follow-up run, if one is owed."""
+    global _repair_running, _repair_pending
+    with _repair_lock:
+        if not _repair_pending:
+            _repair_running = False
+            return
+        _repair_pending = False
+    _launch_repair()
 
 
 # ---------------------------------------------------------------------------
 # ID generator: 00001_YYYY-MM-DD
 # ---------------------------------------------------------------------------
 
+# (date ordinal, "YYYY-MM-DD", "_YYYY-MM-DD") of the last call; formatted
+# once per day.
+_today_cache: tuple[int, str, str] = (-1, "", "")
+
+
+def _today() -> tuple[str, str]:
+    """Return ("YYYY-MM-DD", "_YYYY-MM-DD") for today."""
+    global _today_cache
+    ordinal = date.today().toordinal()
+    if ordinal != _today_cache[0]:
+        today = date.fromordinal(ordinal).isoformat()
+        _today_cache = (ordinal, today, f"_{today}")
+    return _today_cache[1], _today_cache[2]
+
+
 def next_message_id() -> tuple[str, str, str]:
     """
     Generate a monotonically increasing ID for each message, plus a date-based base name.
@@ -102,29 +171,40 @@ def next_message_id() -> tuple[str, str, str]:
         - date_str: "YYYY-MM-DD"
         - base: f"{id_str}_{date_str}"
     """
-    today = date.today().strftime("%Y-%m-%d")
+    return next_message_ids(1)[0]
 
-    if SEQ_FILE.exists():
-        try:
-            current = int(SEQ_FILE.read_text(encoding="utf-8").strip() or "0")
-        except ValueError:
-            current = 0
-    else:
-        current = 0
 
-    new_val = current + 1
-    SEQ_FILE.write_text(str(new_val), encoding="utf-8")
+def next_message_ids(n: int) -> list[tuple[str, str, str]]:
+    """
+    Reserve `n` consecutive message ids with a single locked update of
+    SEQ_FILE (one flock + one write, whatever n is).
+
+    Returns:
+        n (id_str, date_str, base) tuples in increasing id order, shaped
+        like next_message_id()'s return value.
+    """
+    today, base_suffix = _today()
+
+    # Locked read-increment-write, safe across threads and processes.
+    last = allocate_sequence(SEQ_FILE, n)
 
-    id_str = f"{new_val:05d}"
-    base = f"{id_str}_{today}"
-    return id_str, today, base
+    ids = [f"{val:05d}" for val in range(last - n + 1, last + 1)]
+    return [(id_str, today, id_str + base_suffix) for id_str in ids]
 
 
 # ---------------------------------------------------------------------------
 # Chad – wrapper around chad/executor.py
 # ---------------------------------------------------------------------------
 
-def chad_execute_plan(id_str: str, date_str: str, base: str, plan: dict) -> dict:
+def chad_execute_plan(
+    id_str: str,
+    date_str: str,
+    base: str,
+    plan: dict,
+    *,
+    file_contexts: dict[str, str] | None = None,
+    file_stamps: dict[str, tuple[int, int]] | None = None,
+) -> dict:
     """
     Backwards-compatible wrapper so existing tests that import app.chad_execute_plan
     still work, while delegating the real work to chad.executor.chad_execute_plan.
@@ -138,6 +218,8 @@ def chad_execute_plan(id_str: str, date_str: str, base: str, plan: dict) -> dict
         queue_dir=QUEUE_DIR,
         scratch_dir=SCRATCH_DIR,
         notes_dir=MARKDOWN_NOTES_DIR,
+        file_contexts=file_contexts,
+        file_stamps=file_stamps,
     )
 
 
@@ -148,18 +230,20 @@ def chad_execute_plan(id_str: str, date_str: str, base: str, plan: dict) -> dict
 app = Flask(__name__)
 
 chat_bp = create_chat_blueprint(
-    chat_template_path=CHAT_TEMPLATE_PATH,
-    project_root=PROJECT_ROOT,
-    queue_dir=QUEUE_DIR,
-    scratch_dir=SCRATCH_DIR,
-    next_message_id=next_message_id,
-    bob_build_plan=bob_build_plan,
-    bob_refine_codemod_with_files=bob_refine_codemod_with_files,
-    bob_simple_chat=bob_simple_chat,
-    bob_answer_with_context=bob_answer_with_context,
-    chad_execute_plan=chad_execute_plan,
-    log_history_record=log_history_record,
-    auto_repair_fn=_auto_repair_then_retry_async,
+    ChatDeps(
+        chat_template_path=CHAT_TEMPLATE_PATH,
+        project_root=PROJECT_ROOT,
+        queue_dir=QUEUE_DIR,
+        scratch_dir=SCRATCH_DIR,
+        next_message_id=next_message_id,
+        bob_build_plan=bob_build_plan,
+        bob_refine_codemod_with_files=bob_refine_codemod_with_files,
+        bob_simple_chat=bob_simple_chat,
+        bob_answer_with_context=bob_answer_with_context,
+        chad_execute_plan=chad_execute_plan,
+        log_history_record=log_history_record,
+        auto_repair_fn=_auto_repair_then_retry_async,
+    )
 )
 app.register_blueprint(chat_bp)
 
@@ -175,7 +259,41 @@ except ImportError:  # just in case tests module isn't present
     def run_tests_on_startup() -> bool:  # type: ignore[no-redef]
         return True
 
+# ---------------------------------------------------------------------------
+# Server (waitress when installed, else Flask's threaded dev server)
+# ---------------------------------------------------------------------------
+
+try:
+    from waitress import serve as waitress_serve
+except ImportError:  # optional dependency
+    waitress_serve = None
+
+
+def run_server(host: str = "127.0.0.1", port: int = 8765) -> None:
+    """
+    Serve `app`. Each /api/chat holds its thread for the whole model round
+    trip, so use a real thread pool (waitress) when it is available.
+    """
+    if waitress_serve is not None:
+        waitress_serve(app, host=host, port=port, threads=16)
+    else:
+        app.run(host=host, port=port, threaded=True)
+
+
+def _warmup() -> None:
+    """
+    Pay one-off first-request costs before anyone is waiting on them:
+    importing the OpenAI SDK and building the shared client (no network
+    call is made). Failures are ignored; the first request just pays.
+    """
+    try:
+        get_openai_client()
+    except Exception as e:  # noqa: BLE001
+        print(f"[Bob/Chad] warmup skipped: {e!r}")
+
+
 if __name__ == "__main__":
     if run_tests_on_startup():
+        threading.Thread(target=_warmup, name="bob-warmup", daemon=True).start()
         print("[Bob/Chad] Web UI starting on http://127.0.0.1:8765/chat")
-        app.run(host="127.0.0.1", port=8765)
+        run_server()
@@ -0,0 +1,415 @@
+# bob/cache.py
+from __future__ import annotations
+
+"""
+Response caches for Bob's OpenAI calls.
+
+Two layers, both opt-in and both stored under data/cache/:
+
+- ExactCache (BOB_EXACT_CACHE=1): SHA-256 of model + prompts → response text,
+  in a small SQLite file with per-entry expiry.
+- SemanticCache (BOB_SEMANTIC_CACHE=1): (embedding, response) pairs; answers
+  a lookup when a new prompt is close enough (cosine similarity) to one we
+  have already paid for.
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from helpers import jsonio
+
+from .config import get_openai_client, get_model_name
+
+# ---------------------------------------------------------------------------
+# Paths (mirrored from meta/core.py)
+# ---------------------------------------------------------------------------
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT_DIR / "data" / "cache"
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def exact_cache_enabled() -> bool:
+    return os.getenv("BOB_EXACT_CACHE") == "1"
+
+
+def _semantic_cache_enabled() -> bool:
+    return os.getenv("BOB_SEMANTIC_CACHE") == "1"
+
+
+def cache_key(*parts: str) -> str:
+    """SHA-256 hex digest of the NUL-joined parts."""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def _unit(vec: Any) -> List[float]:
+    floats = [float(x) for x in vec]
+    norm = math.sqrt(sum(x * x for x in floats)) or 1.0
+    return [x / norm for x in floats]
+
+
+class _EmbeddingBatcher:
+    """
+    Coalesce concurrent embedding calls into one request (the embeddings
+    endpoint takes a list of inputs).
+
+    No timer: a caller that finds no request in flight sends straight
+    away, alone. Callers that arrive while one is in flight queue up, and
+    the first of them sends the whole queue (up to max_batch) as soon as
+    the wire is free, so a burst of N requests costs ~2 round trips rather
+    than N, and an idle process pays nothing extra.
+    """
+
+    def __init__(self, max_batch: int = 16) -> None:
+        self.max_batch = max_batch
+        self._cond = threading.Condition()
+        self._pending: List[tuple] = []
+        self._busy = False
+
+    def embed(self, client: Any, text: str) -> List[float]:
+        # The endpoint rejects "" and would fail every caller batched with it.
+        if not text:
+            raise ValueError("cannot embed an empty string")
+        fut: Future = Future()
+        with self._cond:
+            self._pending.append((text, fut))
+        while True:
+            with self._cond:
+                while self._busy and not fut.done():
+                    self._cond.wait()
+                if fut.done():
+                    break
+                self._busy = True
+                batch = self._pending[: self.max_batch]
+                del self._pending[: self.max_batch]
+            try:
+                self._send(client, batch)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+        return fut.result()
+
+    @staticmethod
+    def _send(client: Any, batch: List[tuple]) -> None:
+        try:
+            resp = client.embeddings.create(
+                model=EMBEDDING_MODEL, input=[text for text, _ in batch]
+            )
+            for item in resp.data:
+                if 0 <= item.index < len(batch):
+                    fut = batch[item.index][1]
+                    if not fut.done():
+                        fut.set_result(_unit(item.embedding))
+            error: Exception = RuntimeError("embedding missing from response")
+        except Exception as e:  # noqa: BLE001  (delivered to every caller)
+            error = e
+        # Every future must be settled here: a caller whose future is still
+        # pending would otherwise go round embed()'s loop again with nothing
+        # left to send.
+        for _, fut in batch:
+            if not fut.done():
+                fut.set_exception(error)
+
+
+_EMBEDDINGS = _EmbeddingBatcher()
+
+
+def embed_text(client: Any, text: str) -> List[float]:
+    """
+    Embed `text` with EMBEDDING_MODEL and return a unit-length vector,
+    so that a plain dot product between two embeddings is their cosine.
+
+    Concurrent calls share one embeddings request (see _EmbeddingBatcher).
+    """
+    return _EMBEDDINGS.embed(client, text)
+
+
+class ExactCache:
+    """
+    Key → text cache backed by `<cache_dir>/<name>.sqlite3`.
+
+    Each row carries its own expiry timestamp; expired rows are ignored on
+    read and overwritten on the next set().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        ttl: int = 3600,
+        cache_dir: Optional[Path] = None,
+    ) -> None:
+        self.ttl = ttl
+        self.path = (cache_dir or CACHE_DIR) / f"{name}.sqlite3"
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, expires FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, value, expires),
+            )
+            conn.commit()
+
+    def get_json(self, key: str) -> Any:
+        """get() + JSON decode; None on a miss or any storage error."""
+        try:
+            raw = self.get(key)
+            return None if raw is None else jsonio.loads(raw)
+        except (sqlite3.Error, OSError, ValueError):
+            return None
+
+    def set_json(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """JSON encode + set(); storage errors are ignored (best-effort cache)."""
+        try:
+            self.set(key, jsonio.dumps_bytes(value).decode("utf-8"), ttl)
+        except (sqlite3.Error, OSError):
+            pass
+
+
+class SemanticCache:
+    """
+    Small nearest-neighbour cache of model responses.
+
+    Entries are appended to `<cache_dir>/<name>.jsonl`, one JSON document per
+    line: {"ts", "scope", "embedding", "response"}. A lookup only considers
+    entries with the same `scope` (e.g. a hash of model + system prompt), and
+    returns the best response whose similarity is >= threshold.
+
+    Entries are kept oldest first. Expired ones are dropped as lookups and
+    stores go by, and at most `max_entries` are kept (oldest out first), so
+    memory and the per-lookup scan stay bounded in a long-running server.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        threshold: float = 0.92,
+        ttl: int = 3600,
+        max_entries: int = 512,
+        cache_dir: Optional[Path] = None,
+    ) -> None:
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = (cache_dir or CACHE_DIR) / f"{name}.jsonl"
+        self._lock = threading.Lock()
+        self._entries: Optional[List[Dict[str, Any]]] = None
+
+    def _live(self, entry: Dict[str, Any], now: float) -> bool:
+        return now - float(entry.get("ts") or 0) < self.ttl
+
+    def _load(self) -> List[Dict[str, Any]]:
+        """Load entries from disk once, dropping expired / malformed lines."""
+        if self._entries is not None:
+            return self._entries
+
+        entries: List[Dict[str, Any]] = []
+        dropped = 0
+        now = time.time()
+        if self.path.exists():
+            with self.path.open("rb") as f:
+                for line in f:
+                    try:
+                        entry = jsonio.loads(line)
+                    except ValueError:  # bad JSON or a torn (non-UTF-8) line
+                        dropped += 1
+                        continue
+                    if not self._live(entry, now):
+                        dropped += 1
+                        continue
+                    entries.append(entry)
+        if len(entries) > self.max_entries:
+            dropped += len(entries) - self.max_entries
+            del entries[: len(entries) - self.max_entries]
+
+        # Compact the file if we skipped anything, so it doesn't grow forever.
+        if dropped:
+            try:
+                with self.path.open("wb") as f:
+                    for entry in entries:
+                        f.write(jsonio.dumps_bytes(entry) + b"\n")
+            except OSError:
+                pass
+
+        self._entries = entries
+        return entries
+
+    def _prune(self, now: float) -> List[Dict[str, Any]]:
+        """
+        Drop expired entries and any beyond max_entries; call with the lock
+        held. Entries are in insertion (= timestamp) order, so both are a
+        prefix of the list.
+        """
+        entries = self._load()
+        start = max(0, len(entries) - self.max_entries)
+        while start < len(entries) and not self._live(entries[start], now):
+            start += 1
+        if start:
+            del entries[:start]
+        return entries
+
+    def lookup(self, scope: str, embedding: List[float]) -> Optional[str]:
+        """Return the cached response closest to `embedding`, or None."""
+        now = time.time()
+        with self._lock:
+            # Scan a snapshot so concurrent lookups don't queue behind the
+            # dot products.
+            entries = list(self._prune(now))
+
+        best: Optional[str] = None
+        best_score = self.threshold
+        for entry in entries:
+            if entry.get("scope") != scope:
+                continue
+            score = sum(a * b for a, b in zip(embedding, entry["embedding"]))
+            if score >= best_score:
+                best, best_score = entry["response"], score
+        return best
+
+    def store(self, scope: str, embedding: List[float], response: str) -> None:
+        """Remember `response` for `embedding` (memory + append to disk)."""
+        now = time.time()
+        entry = {
+            "ts": now,
+            "scope": scope,
+            "embedding": embedding,
+            "response": response,
+        }
+        with self._lock:
+            entries = self._prune(now)
+            entries.append(entry)
+            if len(entries) > self.max_entries:
+                del entries[0]
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("ab") as f:
+                    f.write(jsonio.dumps_bytes(entry) + b"\n")
+            except OSError:
+                # Cache persistence is best-effort; the in-memory copy still works.
+                pass
+
+def semantic_cached(
+    *, threshold: float = 0.92, ttl: int = 3600
+) -> Callable[[Callable[..., str]], Callable[..., str]]:
+    """
+    Decorate `fn(system_prompt, *user_messages) -> str` with a SemanticCache.
+
+    The system prompt (plus model name) is hashed into the cache scope, so
+    only prompts built from the same system prompt can share answers; the
+    user messages are embedded and compared by cosine similarity.
+
+    The model is only called after the lookup misses, so a hit saves the
+    whole model call (tokens included), at the price of one embedding round
+    trip before every miss.
+
+    Falls straight through to `fn` when BOB_SEMANTIC_CACHE is not "1", when
+    there is no OpenAI client, or when the embedding call itself fails.
+    Empty responses are never cached.
+    """
+
+    def decorator(fn: Callable[..., str]) -> Callable[..., str]:
+        cache = SemanticCache(
+            f"{fn.__module__}.{fn.__qualname__}", threshold=threshold, ttl=ttl
+        )
+
+        @wraps(fn)
+        def wrapper(system_prompt: str, *user_messages: str) -> str:
+            client = get_openai_client()
+            if client is None or not _semantic_cache_enabled():
+                return fn(system_prompt, *user_messages)
+
+            scope = cache_key(get_model_name(), system_prompt)
+            try:
+                embedding = embed_text(client, "\n\n".join(user_messages))
+            except Exception:  # noqa: BLE001
+                return fn(system_prompt, *user_messages)
+
+            hit = cache.lookup(scope, embedding)
+            if hit is not None:
+                return hit
+
+            result = fn(system_prompt, *user_messages)
+            if result:
+                cache.store(scope, embedding, result)
+            return result
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+def exact_cached(
+    *, ttl: int = 3600
+) -> Callable[[Callable[..., str]], Callable[..., str]]:
+    """
+    Decorate `fn(system_prompt, *user_messages) -> str` with an ExactCache.
+
+    The key is the SHA-256 of model + system prompt + user messages, so only a
+    byte-identical request is answered from the cache. Falls straight through
+    to `fn` unless BOB_EXACT_CACHE is "1". Empty responses are never cached.
+    """
+
+    def decorator(fn: Callable[..., str]) -> Callable[..., str]:
+        cache = ExactCache(f"{fn.__module__}.{fn.__qualname__}", ttl=ttl)
+
+        @wraps(fn)
+        def wrapper(system_prompt: str, *user_messages: str) -> str:
+            if not exact_cache_enabled():
+                return fn(system_prompt, *user_messages)
+
+            key = cache_key(get_model_name(), system_prompt, *user_messages)
+            try:
+                hit = cache.get(key)
+            except (sqlite3.Error, OSError):
+                hit = None
+            if hit is not None:
+                return hit
+
+            result = fn(system_prompt, *user_messages)
+            if result:
+                try:
+                    cache.set(key, result)
+                except (sqlite3.Error, OSError):
+                    pass
+            return result
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
@@ -3,12 +3,49 @@ from __future__ import annotations
 from typing import Dict
 
 from helpers.prompts import get_prompt
-from .config import get_openai_client, get_model_name
+from .cache import exact_cached, semantic_cached
+from .config import HAS_OPENAI_KEY, get_openai_client, get_model_name, model_call_slot
 
 
-def bob_simple_chat(user_text: str) -> str:
+def _respond(system_prompt: str, *user_messages: str) -> str:
+    """
+    One Responses API round trip: system prompt + user messages → stripped text.
+
+    Raises on OpenAI errors; callers turn those into a friendly reply.
+    """
     client = get_openai_client()
-    if client is None:
+    with model_call_slot():
+        resp = client.responses.create(
+            model=get_model_name(),
+            input=[{"role": "system", "content": system_prompt}]
+            + [{"role": "user", "content": m} for m in user_messages],
+        )
+    return (resp.output_text or "").strip()
+
+
+@exact_cached(ttl=3600)
+@semantic_cached(threshold=0.92, ttl=3600)
+def _ask(system_prompt: str, *user_messages: str) -> str:
+    """
+    Free-form chat (bob_simple_chat); the only call where near-duplicate
+    questions may share an answer through the semantic cache.
+    """
+    return _respond(system_prompt, *user_messages)
+
+
+@exact_cached(ttl=3600)
+def _ask_about_snippet(
+        system_prompt: str, request_message: str, snippet_message: str
+) -> str:
+    """
+    File review. Exact cache only: a near-duplicate question about another
+    file (or another version of this one) must never reuse this answer.
+    """
+    return _respond(system_prompt, request_message, snippet_message)
+
+
+def bob_simple_chat(user_text: str) -> str:
+    if not HAS_OPENAI_KEY:
         return (
             f"You asked: {user_text!r}. I can't call OpenAI because "
             f"OPENAI_API_KEY is not configured."
@@ -17,21 +54,14 @@ def bob_simple_chat(user_text: str) -> str:
     system_prompt = get_prompt("bob_simple_chat_system")
 
     try:
-        resp = client.responses.create(
-            model=get_model_name(),
-            input=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_text},
-            ],
-        )
-        return (resp.output_text or "").strip() or "I couldn't generate a detailed answer."
+        answer = _ask(system_prompt, user_text)
+        return answer or "I couldn't generate a detailed answer."
     except Exception as e:
         return f"I tried to answer but hit an OpenAI error: {e!r}"
 
 
 def bob_answer_with_context(user_text: str, plan: Dict, snippet: str) -> str:
-    client = get_openai_client()
-    if client is None:
+    if not HAS_OPENAI_KEY:
         return "I’d like to review the file, but OPENAI_API_KEY is not configured."
 
     if not snippet:
@@ -40,14 +70,11 @@ def bob_answer_with_context(user_text: str, plan: Dict, snippet: str) -> str:
         system_prompt = get_prompt("bob_answer_with_snippet")
 
     try:
-        resp = client.responses.create(
-            model=get_model_name(),
-            input=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"User request:\n{user_text}"},
-                {"role": "user", "content": f"File contents snippet:\n\n{snippet}"},
-            ],
+        review = _ask_about_snippet(
+            system_prompt,
+            f"User request:\n{user_text}",
+            f"File contents snippet:\n\n{snippet}",
         )
-        return (resp.output_text or "").strip() or "I couldn't generate a detailed review."
+        return review or "I couldn't generate a detailed review."
     except Exception as e:
         return f"I tried to review the file but hit an OpenAI error: {e!r}"
@@ -1,11 +1,54 @@
 # bob/config.py
 from __future__ import annotations
 
+import atexit
 import os
+import threading
+from contextlib import contextmanager
 from functools import lru_cache
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Iterator, Optional
 
-from openai import OpenAI
+from helpers.env import load_env
+
+if TYPE_CHECKING:  # the SDK is imported on first use (see get_openai_client)
+    from openai import OpenAI
+
+# ---------------------------------------------------------------------------
+# Env (read once at import; restart the process after changing .env)
+# ---------------------------------------------------------------------------
+
+load_env()
+
+OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY") or ""
+HAS_OPENAI_KEY: bool = bool(OPENAI_API_KEY)
+"""
+True when an OpenAI API key was configured at startup. Bob's entry points
+check this instead of re-reading the environment on every request.
+"""
+
+BOB_MODEL: str = os.getenv("BOB_MODEL") or ""
+"""
+Model override from the environment ("" → get_model_name's default).
+get_model_name() runs for every model call and cache key, so it reads
+this constant instead of the environment.
+"""
+
+
+def _max_concurrent_calls(default: int = 8) -> int:
+    raw = os.getenv("BOB_MAX_CONCURRENT_CALLS") or ""
+    if not raw:
+        return default
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        print(f"[Bob] invalid BOB_MAX_CONCURRENT_CALLS={raw!r}; using {default}")
+        return default
+
+
+# At most this many Responses API calls in flight per process; further
+# callers queue here instead of tripping the provider's rate limits.
+BOB_MAX_CONCURRENT_CALLS: int = _max_concurrent_calls()
+_MODEL_CALL_SLOTS = threading.BoundedSemaphore(BOB_MAX_CONCURRENT_CALLS)
 
 
 @lru_cache(maxsize=1)
@@ -19,10 +62,56 @@ def get_openai_client() -> Optional[OpenAI]:
     Returns:
         OpenAI | None
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if not HAS_OPENAI_KEY:
         return None
-    return OpenAI(api_key=api_key)
+    # Importing the SDK costs most of a second; stub mode, tests and the
+    # meta CLI never need it, so only pay for it when a client is built.
+    import openai
+
+    http_client = _build_http_client(openai)
+    atexit.register(http_client.close)
+    return openai.OpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
+
+
+def _build_http_client(openai: Any) -> Any:
+    """
+    One pooled HTTP client shared by every OpenAI call in the process.
+
+    Built with the SDK's own DefaultHttpxClient, so it is whatever HTTP
+    library the installed SDK uses and keeps the SDK's other defaults.
+    Keep-alive slots match the concurrent-call limit, so calls from separate
+    Flask threads reuse warm TLS connections rather than handshaking again.
+    Idle connections are kept for 60s (the SDK's default is 5s, shorter
+    than the usual gap between two chat messages). Reads keep the SDK's
+    own 600s limit, since plan and refine replies can take minutes; only
+    connecting is capped at 5s.
+    HTTP/2 (all calls multiplexed on one connection) is only enabled when
+    the optional `h2` package is installed.
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    defaults = openai.DEFAULT_CONNECTION_LIMITS
+    limits = type(defaults)(
+        max_connections=max(BOB_MAX_CONCURRENT_CALLS, 20),
+        max_keepalive_connections=BOB_MAX_CONCURRENT_CALLS,
+        keepalive_expiry=60.0,
+    )
+    return openai.DefaultHttpxClient(
+        http2=http2,
+        limits=limits,
+        timeout=openai.Timeout(600.0, connect=5.0),
+    )
+
+
+@contextmanager
+def model_call_slot() -> Iterator[None]:
+    """Hold one of the BOB_MAX_CONCURRENT_CALLS model-call slots."""
+    with _MODEL_CALL_SLOTS:
+        yield
 
 
 def get_model_name(default: str = "gpt-4.1-mini") -> str:
@@ -30,7 +119,7 @@ def get_model_name(default: str = "gpt-4.1-mini") -> str:
     Resolve Bob's model name from the environment with a safe fallback.
 
     Env:
-        BOB_MODEL - override model name
+        BOB_MODEL - override model name (read once at import, like the key)
 
     Args:
         default: Model fallback if no env override is provided.
@@ -38,7 +127,7 @@ def get_model_name(default: str = "gpt-4.1-mini") -> str:
     Returns:
         Name of the model to use.
     """
-    return os.getenv("BOB_MODEL", default)
+    return BOB_MODEL or default
 
 
 # ---------------------------------------------------------------------------
@@ -1,19 +1,28 @@
 # bob/planner.py
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from helpers import jsonio
 from helpers.prompts import get_prompt
+from helpers.text import write_file_bytes
 from helpers.tools_prompt import describe_tools_for_prompt
-from .config import get_openai_client, get_model_name
-from .schema import BOB_PLAN_SCHEMA
+from .cache import ExactCache, exact_cache_enabled, exact_cached
+from .config import HAS_OPENAI_KEY, get_openai_client, get_model_name, model_call_slot
+from .schema import BOB_PLAN_SCHEMA_JSON, plan_schema_error
 import re
 
 
-def _extract_first_json_object(text: str) -> str:
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _decode_first_json_object(text: str) -> Any:
     """
     Try to grab the first top-level JSON object from a messy LLM response.
 
@@ -22,49 +31,228 @@ def _extract_first_json_object(text: str) -> str:
         ```json
         {...}
         ```
-    by returning only the first balanced {...}.
+    by decoding only the first {...}: JSONDecoder.raw_decode parses from the
+    first '{' in C and stops where that object ends, so no Python-level
+    brace counting and no second parse of the extracted slice.
     """
     start = text.find("{")
     if start == -1:
         raise ValueError("No opening '{' found in text")
 
-    depth = 0
-    in_string = False
-    escape = False
+    try:
+        obj, _end = _JSON_DECODER.raw_decode(text, start)
+    except json.JSONDecodeError as e:
+        raise ValueError("Could not find balanced JSON object in text") from e
+    return obj
 
-    for i in range(start, len(text)):
-        ch = text[i]
 
-        if in_string:
-            if escape:
-                escape = False
-            elif ch == "\\":
-                escape = True
-            elif ch == '"':
-                in_string = False
-            continue
+def parse_plan_json(raw: str) -> dict:
+    try:
+        return jsonio.loads(raw)
+    except json.JSONDecodeError:
+        return _decode_first_json_object(raw)
+
+
+# ---------------------------------------------------------------------------
+# Prompts (rendered once at import; everything but the user text is static)
+# ---------------------------------------------------------------------------
+
+TOOL_MODE_TEXT_ENABLED = (
+    "Tools ARE ENABLED for this request. You should choose task_type='tool' whenever "
+    "the user is asking you to interact with the live project/filesystem, write notes, "
+    "run a script, or send email — even if they do NOT mention tool names.\n"
+)
+
+TOOL_MODE_TEXT_DISABLED = (
+    "Tools ARE DISABLED for this request. You MUST NOT choose task_type='tool', and "
+    "you MUST leave the 'tool' object empty. Handle the request purely as 'chat', "
+    "'analysis', or 'codemod'.\n"
+)
+
+
+def _render_planner_system_prompt(tool_mode_text: str) -> str:
+    """
+    Render prompts/bob_planner_system.md for one tool mode.
 
-        if ch == '"':
-            in_string = True
+    TOOL_MODE_TEXT is the template's last slot, so both variants share one
+    long identical prefix (rules, tools, schema) that the provider's prompt
+    cache can reuse across requests regardless of tool mode.
+    """
+    return get_prompt("bob_planner_system").format(
+        TOOL_MODE_TEXT=tool_mode_text,
+        TOOLS_BLOCK=describe_tools_for_prompt(),
+        BOB_PLAN_SCHEMA=BOB_PLAN_SCHEMA_JSON,
+    )
+
+
+_SYSTEM_PROMPT_TOOLS_ON = _render_planner_system_prompt(TOOL_MODE_TEXT_ENABLED)
+_SYSTEM_PROMPT_TOOLS_OFF = _render_planner_system_prompt(TOOL_MODE_TEXT_DISABLED)
+
+# The refine prompt only varies by USER_TEXT: render the rest once and keep
+# the text either side of the placeholder.
+_USER_TEXT_MARKER = "\x00USER_TEXT\x00"
+_REFINE_PROMPT_HEAD, _REFINE_PROMPT_TAIL = (
+    get_prompt("bob_planner_refine_codemod")
+    .format(USER_TEXT=_USER_TEXT_MARKER, BOB_PLAN_SCHEMA=BOB_PLAN_SCHEMA_JSON)
+    .split(_USER_TEXT_MARKER, 1)
+)
+
+
+# ---------------------------------------------------------------------------
+# Fast routes: trivial one-tool requests planned without a model call
+# ---------------------------------------------------------------------------
+
+# BOB_FAST_ROUTES=0 sends everything through the model planner.
+_FAST_ROUTES_ENABLED = os.getenv("BOB_FAST_ROUTES") != "0"
+
+# Never starts with '-', so flags ("ls -la") are left to the model.
+_PATH = r"(?!-)([\w./-]+)"
+# Needs a '.' or '/' to look like a file, and must end in a file name
+# (not "./", "src/" or ".."), so directories are left to the model.
+_FILE_PATH = r"(?!-)(?=[\w./-]*[./])((?:[\w.-]*/)*[\w.-]*\w[\w.-]*)"
+
+# Each pattern must match the *whole* (lower-cased, trimmed) message, so
+# anything with extra instructions ("read x.py and explain it") still goes
+# to the model.
+_FAST_ROUTES: list[tuple[re.Pattern[str], str]] = [
+    (
+        re.compile(
+            r"(?:what(?:'s| is)? (?:the )?(?:current )?(?:time|date)"
+            r"(?: is it)?(?: now| today)?|time|date)\??"
+        ),
+        "get_current_datetime",
+    ),
+    (re.compile(r"(?:ls|(?:list|show) files(?: in)?) " + _PATH), "list_files"),
+    (re.compile(r"(?:cat|read|open) " + _FILE_PATH), "read_file"),
+]
+
+
+def _fast_route(user_text: str) -> Optional[Dict[str, Any]]:
+    """
+    Return a ready-made 'tool' task for an obvious one-tool request, or None.
+
+    Path arguments keep the user's original casing.
+    """
+    text = user_text.strip()
+    lowered = text.lower()
+    for pattern, tool_name in _FAST_ROUTES:
+        m = pattern.fullmatch(lowered)
+        if m is None:
             continue
+        args: Dict[str, Any] = {}
+        if m.lastindex:
+            args["path"] = text[m.start(1):m.end(1)]
+        return {
+            "type": "tool",
+            "summary": f"Run {tool_name} for: {text}",
+            "analysis_file": "",
+            "edits": [],
+            "tool": {"name": tool_name, "args": args},
+        }
+    return None
 
-        if ch == "{":
-            depth += 1
-        elif ch == "}":
-            depth -= 1
-            if depth == 0:
-                # end of the first top-level object
-                return text[start : i + 1]
 
-    raise ValueError("Could not find balanced JSON object in text")
+# Exact cache only: plans must never come from the semantic cache, because
+# "delete a.py" and "delete b.py" embed as near-duplicates and a reused plan
+# would hand Chad edits for the wrong file.
+@exact_cached(ttl=3600)
+def _ask_for_plan(system_prompt: str, user_text: str) -> str:
+    """
+    Ask the model for a JSON plan and return the raw (stripped) reply text.
 
+    Raises on OpenAI errors; bob_build_plan falls back to a stub plan.
+    """
+    client = get_openai_client()
+    with model_call_slot():
+        resp = client.responses.create(
+            model=get_model_name(),
+            input=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_text},
+            ],
+            text={"format": {"type": "json_object"}},
+        )
+    return (resp.output_text or "").strip()
 
-def parse_plan_json(raw: str) -> dict:
+
+@exact_cached(ttl=3600)
+def _ask_for_refinement(refine_prompt: str, files_message: str) -> str:
+    """
+    Ask the model to refine a codemod given real file contents; returns the
+    raw (stripped) JSON reply text. Raises on OpenAI errors.
+    """
+    client = get_openai_client()
+    with model_call_slot():
+        resp = client.responses.create(
+            model=get_model_name(),
+            input=[
+                {"role": "system", "content": refine_prompt},
+                {"role": "user", "content": files_message},
+            ],
+            text={"format": {"type": "json_object"}},
+        )
+    return (resp.output_text or "").strip()
+
+
+# Refined codemod tasks, keyed on everything the refinement depends on.
+_REFINE_CACHE = ExactCache("bob.planner.refine", ttl=86400)
+
+
+def _refine_cache_key(
+        user_text: str,
+        base_summary: str,
+        file_contexts: Dict[str, str],
+) -> str:
+    """BLAKE2b over model, user text, base summary and (path, contents) pairs."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in (get_model_name(), user_text, base_summary):
+        data = part.encode("utf-8")
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    for rel_path, contents in sorted(file_contexts.items()):
+        for part in (rel_path, contents):
+            data = part.encode("utf-8")
+            h.update(len(data).to_bytes(8, "big"))
+            h.update(data)
+    return h.hexdigest()
+
+
+# plan.json is a debugging artefact; nothing reads it on the request path,
+# so it is written compact (see readme for pretty-printing) and the write
+# itself happens on one background thread (in submission order). Pending
+# writes are still flushed at interpreter exit.
+_PLAN_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bob-plan-writer")
+
+
+def _write_plan_bytes(path: Path, data: bytes) -> None:
     try:
-        return json.loads(raw)
-    except json.JSONDecodeError:
-        cleaned = _extract_first_json_object(raw)
-        return json.loads(cleaned)
+        write_file_bytes(path, data)
+    except OSError as e:
+        print(f"[Bob] could not write {path}: {e!r}")
+
+
+def _write_plan(queue_dir: Path, base: str, plan: Dict[str, Any]) -> None:
+    """
+    Persist `{base}.plan.json` into queue_dir in the background.
+
+    The plan is encoded here, on the caller's thread: callers such as
+    api_chat go on to mutate the dict (plan["task"] = refined_task), so only
+    the finished bytes may cross to the writer thread.
+    """
+    _PLAN_WRITER.submit(
+        _write_plan_bytes,
+        queue_dir / f"{base}.plan.json",
+        jsonio.dumps_bytes(plan),
+    )
+
+
+def _repair_request(user_text: str, problem: str) -> str:
+    """User message asking the planner to redo a reply that failed the schema."""
+    return (
+        f"{user_text}\n\n"
+        f"(Your previous plan for this request was rejected: {problem}. "
+        "Reply again with one JSON object that matches the schema exactly.)"
+    )
 
 
 def bob_build_plan(
@@ -90,12 +278,29 @@ def bob_build_plan(
           `{base}.plan.json` into that directory for debugging/inspection.
     """
     now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-    client = get_openai_client()
+
+    # ------------------------------------------------------------------
+    # Fast route: obvious one-tool requests need no model call (or key)
+    # ------------------------------------------------------------------
+    fast_task = _fast_route(user_text) if tools_enabled and _FAST_ROUTES_ENABLED else None
+    if fast_task is not None:
+        plan: Dict[str, Any] = {
+            "id": id_str,
+            "date": date_str,
+            "created_at": now,
+            "actor": "bob",
+            "kind": "plan",
+            "raw_user_text": user_text,
+            "task": fast_task,
+        }
+        if queue_dir is not None:
+            _write_plan(queue_dir, base, plan)
+        return plan
 
     # ------------------------------------------------------------------
     # Stub mode when there is no API key / client
     # ------------------------------------------------------------------
-    if client is None:
+    if not HAS_OPENAI_KEY:
         plan: Dict[str, Any] = {
             "id": id_str,
             "date": date_str,
@@ -112,54 +317,28 @@ def bob_build_plan(
             },
         }
         if queue_dir is not None:
-            (queue_dir / f"{base}.plan.json").write_text(
-                json.dumps(plan, indent=2), encoding="utf-8"
-            )
+            _write_plan(queue_dir, base, plan)
         return plan
 
     # ------------------------------------------------------------------
-    # Tool mode guidance
+    # System prompt (loaded from markdown, pre-rendered per tool mode)
     # ------------------------------------------------------------------
-    if tools_enabled:
-        tool_mode_text = (
-            "Tools ARE ENABLED for this request. You should choose task_type='tool' whenever "
-            "the user is asking you to interact with the live project/filesystem, write notes, "
-            "run a script, or send email — even if they do NOT mention tool names.\n"
-        )
-    else:
-        tool_mode_text = (
-            "Tools ARE DISABLED for this request. You MUST NOT choose task_type='tool', and "
-            "you MUST leave the 'tool' object empty. Handle the request purely as 'chat', "
-            "'analysis', or 'codemod'.\n"
-        )
-
-    tools_block = describe_tools_for_prompt()
-
-    # ------------------------------------------------------------------
-    # System prompt (loaded from markdown)
-    # ------------------------------------------------------------------
-    system_template = get_prompt("bob_planner_system")
-    system_prompt = system_template.format(
-        TOOL_MODE_TEXT=tool_mode_text,
-        TOOLS_BLOCK=tools_block,
-        BOB_PLAN_SCHEMA=json.dumps(BOB_PLAN_SCHEMA, indent=2),
-    )
+    system_prompt = _SYSTEM_PROMPT_TOOLS_ON if tools_enabled else _SYSTEM_PROMPT_TOOLS_OFF
 
     # ------------------------------------------------------------------
     # Call OpenAI to build the plan
     # ------------------------------------------------------------------
     try:
-        resp = client.responses.create(
-            model=get_model_name(),
-            input=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_text},
-            ],
-            text={"format": {"type": "json_object"}},
-        )
-
-        raw = (resp.output_text or "").strip()
+        raw = _ask_for_plan(system_prompt, user_text)
         body = parse_plan_json(raw)
+        problem = plan_schema_error(body)
+        if problem is not None:
+            # One repair round trip, then give up (falls back to the stub).
+            raw = _ask_for_plan(system_prompt, _repair_request(user_text, problem))
+            body = parse_plan_json(raw)
+            problem = plan_schema_error(body)
+            if problem is not None:
+                raise ValueError(f"plan does not match schema: {problem}")
 
         task_type = body.get("task_type", "analysis")
         summary = (body.get("summary") or user_text).strip()
@@ -190,9 +369,7 @@ def bob_build_plan(
     }
 
     if queue_dir is not None:
-        (queue_dir / f"{base}.plan.json").write_text(
-            json.dumps(plan, indent=2), encoding="utf-8"
-        )
+        _write_plan(queue_dir, base, plan)
 
     return plan
 
@@ -214,58 +391,55 @@ def bob_refine_codemod_with_files(
         A new task dict (type='codemod') with refined edits, or the original
         base_task on error/fallback.
     """
-    client = get_openai_client()
-    if client is None:
+    if not HAS_OPENAI_KEY or not file_contexts:
         return base_task
 
-    if not file_contexts:
-        return base_task
-
-    files_blob_lines: list[str] = []
-    for rel_path, contents in file_contexts.items():
-        files_blob_lines.append(
-            f"===== FILE: {rel_path} =====\n{contents}\n===== END FILE =====\n"
+    # Same request against the same file contents → same refined task;
+    # skip building the files blob and the model round trip entirely.
+    cache_key: Optional[str] = None
+    if exact_cache_enabled():
+        cache_key = _refine_cache_key(
+            user_text, base_task.get("summary", ""), file_contexts
         )
-    files_blob = "\n".join(files_blob_lines)
+        cached_task = _REFINE_CACHE.get_json(cache_key)
+        if isinstance(cached_task, dict):
+            return cached_task
+
+    # One join over flat pieces builds the whole user message, so each file's
+    # contents are copied exactly once (no per-file f-string, no second copy
+    # for the intro line). Output is identical to the old per-file format.
+    pieces: list[str] = ["Here are the current file contents you may edit:\n\n"]
+    for i, (rel_path, contents) in enumerate(file_contexts.items()):
+        if i:
+            pieces.append("\n")
+        pieces += (
+            "===== FILE: ", rel_path, " =====\n",
+            contents, "\n===== END FILE =====\n",
+        )
+    files_message = "".join(pieces)
 
     # ------------------------------------------------------------------
-    # Refinement prompt (loaded from markdown)
+    # Refinement prompt (pre-rendered around the user text)
     # ------------------------------------------------------------------
-    refine_template = get_prompt("bob_planner_refine_codemod")
-    refine_prompt = refine_template.format(
-        USER_TEXT=user_text,
-        BOB_PLAN_SCHEMA=json.dumps(BOB_PLAN_SCHEMA, indent=2),
-    )
+    refine_prompt = _REFINE_PROMPT_HEAD + user_text + _REFINE_PROMPT_TAIL
 
     try:
-        resp = client.responses.create(
-            model=get_model_name(),
-            input=[
-                {"role": "system", "content": refine_prompt},
-                {
-                    "role": "user",
-                    "content": (
-                        "Here are the current file contents you may edit:\n\n"
-                        f"{files_blob}"
-                    ),
-                },
-            ],
-            text={"format": {"type": "json_object"}},
-        )
-
-        raw = (resp.output_text or "").strip()
+        raw = _ask_for_refinement(refine_prompt, files_message)
         body = parse_plan_json(raw)
 
         summary = (body.get("summary") or base_task.get("summary", "")).strip()
         edits = body.get("edits") or []
 
-        return {
+        refined: Dict[str, Any] = {
             "type": "codemod",
             "summary": summary or base_task.get("summary", ""),
             "analysis_file": "",
             "edits": edits,
             "tool": {},
         }
+        if cache_key is not None:
+            _REFINE_CACHE.set_json(cache_key, refined)
+        return refined
     except Exception as e:  # noqa: BLE001
         fallback = dict(base_task)
         fallback.setdefault(
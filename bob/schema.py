@@ -9,6 +9,14 @@ building a plan for Chad to execute. It is referenced in prompts and can also
 be used for validation on the Python side if desired.
 """
 
+import json
+from typing import Any, Optional
+
+try:
+    import fastjsonschema
+except ImportError:  # optional dependency; without it plans go unvalidated
+    fastjsonschema = None  # type: ignore[assignment]
+
 BOB_PLAN_SCHEMA = {
     "type": "object",
     "properties": {
@@ -41,6 +49,7 @@ BOB_PLAN_SCHEMA = {
                             "prepend_comment",
                             "create_or_overwrite_file",
                             "append_to_bottom",
+                            "replace",
                         ],
                     },
                     "content": {
@@ -65,6 +74,7 @@ BOB_PLAN_SCHEMA = {
                         "create_markdown_note",
                         "append_to_markdown_note",
                         "send_email",
+                        "run_python_script",
                     ],
                 },
                 "args": {
@@ -79,3 +89,28 @@ BOB_PLAN_SCHEMA = {
     "required": ["task_type", "summary", "analysis_file", "edits"],
     "additionalProperties": False,
 }
+
+# Pre-serialised once; prompts embed this text on every planning request.
+BOB_PLAN_SCHEMA_JSON = json.dumps(BOB_PLAN_SCHEMA, indent=2)
+
+
+# Compiled once: fastjsonschema generates a Python validator for this schema.
+_validate_plan = (
+    fastjsonschema.compile(BOB_PLAN_SCHEMA) if fastjsonschema is not None else None
+)
+
+
+def plan_schema_error(body: Any) -> Optional[str]:
+    """
+    Check a parsed planner reply against BOB_PLAN_SCHEMA.
+
+    Returns None when the body is valid (or fastjsonschema is not
+    installed), otherwise a one-line description of the first problem.
+    """
+    if _validate_plan is None:
+        return None
+    try:
+        _validate_plan(body)
+    except fastjsonschema.JsonSchemaException as e:
+        return str(e)
+    return None
@@ -2,18 +2,24 @@
 
 from __future__ import annotations
 
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from bob.tools_registry import TOOL_REGISTRY
+from helpers import jsonio
+from helpers.jail import resolve_in_project_jail
 from helpers.text import (
+    FileStamp,
+    file_stamp,
     safe_write_text,
+    write_file_bytes,
     normalize_newlines,
-    contains_suspicious_control_chars,
-    strip_suspicious_control_chars,
+    sanitize_control_chars,
     detect_comment_prefix,
+    read_text_head,
 )
 from chad.tools import run_tool as run_chad_tool
 
@@ -32,6 +38,8 @@ def chad_execute_plan(
     queue_dir: Path,
     scratch_dir: Path,
     notes_dir: Path,
+    file_contexts: Optional[Dict[str, str]] = None,
+    file_stamps: Optional[Dict[str, FileStamp]] = None,
 ) -> dict:
     """
     Chad executes Bob's plan.
@@ -41,6 +49,12 @@ def chad_execute_plan(
       - For task.type == 'analysis' → reads a file snippet for Bob.
       - For task.type == 'codemod'  → applies edits INSIDE project_root.
       - Returns a dict exec_report; NEVER returns None.
+
+    file_contexts (relative path → contents) are files the caller read
+    earlier, e.g. for Bob's refine pass, and file_stamps their FileStamp at
+    read time. The codemod loop reuses a context only while a stat() still
+    matches its stamp; anything changed (or unstamped) is re-read, so a save
+    made during the refine call is never overwritten with old text.
     """
     scratch_dir.mkdir(parents=True, exist_ok=True)
     queue_dir.mkdir(parents=True, exist_ok=True)
@@ -87,15 +101,20 @@ def chad_execute_plan(
                 tool_result, message = result
 
         scratch_file = scratch_dir / f"{base}.txt"
-        scratch_file.write_text(
-            "GhostFrog Chad tool execution\n"
-            f"ID: {base}\n"
-            f"Time: {now}\n"
-            f"Tool name: {tool_name or '(none)'}\n"
-            f"Tool args: {tool_args}\n"
-            f"Tool result:\n{tool_result or '(no result)'}\n",
-            encoding="utf-8",
-        )
+        # tool_args goes in as compact JSON bytes (one C-level encode, and the
+        # exec report needs it JSON-serialisable anyway) rather than a repr.
+        scratch_parts: list[bytes] = [
+            (
+                "GhostFrog Chad tool execution\n"
+                f"ID: {base}\n"
+                f"Time: {now}\n"
+                f"Tool name: {tool_name or '(none)'}\n"
+                "Tool args: "
+            ).encode("utf-8"),
+            jsonio.dumps_bytes(tool_args),
+            f"\nTool result:\n{tool_result or '(no result)'}\n".encode("utf-8"),
+        ]
+        write_file_bytes(scratch_file, b"".join(scratch_parts))
 
         exec_report = {
             "id": id_str,
@@ -114,7 +133,7 @@ def chad_execute_plan(
             "message": message,
         }
         exec_path = queue_dir / f"{base}.exec.json"
-        exec_path.write_text(json.dumps(exec_report, indent=2), encoding="utf-8")
+        write_file_bytes(exec_path, jsonio.dumps_bytes(exec_report))
         return exec_report
 
     # ------------------------------------------------------------------
@@ -126,27 +145,29 @@ def chad_execute_plan(
         target_rel: Optional[str] = None
 
         if analysis_file:
-            target_path = (project_root / analysis_file).resolve()
-            try:
-                target_path.relative_to(project_root)
-            except ValueError:
-                target_path = None
+            target_path = resolve_in_project_jail(analysis_file, project_root)
 
-            if target_path is not None and target_path.exists():
+            if target_path is not None:
+                # Only the first 16k characters are needed, so only read those.
+                # No exists() pre-check: a missing file is FileNotFoundError.
                 try:
-                    raw = target_path.read_text(encoding="utf-8")
+                    analysis_snippet, _truncated = read_text_head(target_path, 16000)
+                    target_rel = str(target_path.relative_to(project_root))
+                except FileNotFoundError:
+                    pass
                 except Exception:
-                    raw = ""
-                analysis_snippet = raw[:16000]
-                target_rel = str(target_path.relative_to(project_root))
+                    analysis_snippet = ""
+                    target_rel = str(target_path.relative_to(project_root))
 
         scratch_file = scratch_dir / f"{base}.txt"
-        scratch_file.write_text(
-            "GhostFrog Chad analysis execution\n"
-            f"ID: {base}\n"
-            f"Time: {now}\n"
-            f"Analysis file: {target_rel or '(none)'}\n",
-            encoding="utf-8",
+        write_file_bytes(
+            scratch_file,
+            (
+                "GhostFrog Chad analysis execution\n"
+                f"ID: {base}\n"
+                f"Time: {now}\n"
+                f"Analysis file: {target_rel or '(none)'}\n"
+            ).encode("utf-8"),
         )
 
         exec_report = {
@@ -166,7 +187,7 @@ def chad_execute_plan(
             ),
         }
         exec_path = queue_dir / f"{base}.exec.json"
-        exec_path.write_text(json.dumps(exec_report, indent=2), encoding="utf-8")
+        write_file_bytes(exec_path, jsonio.dumps_bytes(exec_report))
         return exec_report
 
     # ------------------------------------------------------------------
@@ -174,13 +195,37 @@ def chad_execute_plan(
     # ------------------------------------------------------------------
     edit_logs: list[dict] = []
 
-    for edit in edits:
+    # Known current contents, keyed by resolved path so "a.py" and "./a.py"
+    # share an entry; updated after every write so a second edit to the same
+    # file sees the first one.
+    known_contents: Dict[Path, str] = {}
+    stamps = file_stamps or {}
+    for rel, contents in (file_contexts or {}).items():
+        stamp = stamps.get(rel)
+        known_path = resolve_in_project_jail(rel, project_root)
+        if stamp is None or known_path is None:
+            continue
+        try:
+            if file_stamp(os.stat(known_path)) != stamp:
+                continue  # changed since it was read: re-read in _apply_edit
+        except OSError:
+            continue
+        known_contents[known_path] = contents
+
+    # Validate and resolve every edit up front, then group them by target
+    # file. Each edit gets its own log/touched slot so the report keeps plan
+    # order even when files are processed concurrently.
+    slot_logs: list[list[dict]] = [[] for _ in edits]
+    slot_touched: list[list[str]] = [[] for _ in edits]
+    targets: Dict[int, Path] = {}
+    groups: Dict[Path, list[int]] = {}
+
+    for index, edit in enumerate(edits):
         file_rel = edit.get("file")
         op = edit.get("operation")
-        content = edit.get("content", "")
 
         if not file_rel or not op:
-            edit_logs.append(
+            slot_logs[index].append(
                 {
                     "file": file_rel or "(none)",
                     "operation": op or "(none)",
@@ -189,11 +234,9 @@ def chad_execute_plan(
             )
             continue
 
-        target_path = (project_root / file_rel).resolve()
-        try:
-            target_path.relative_to(project_root)
-        except ValueError:
-            edit_logs.append(
+        target_path = resolve_in_project_jail(file_rel, project_root)
+        if target_path is None:
+            slot_logs[index].append(
                 {
                     "file": file_rel,
                     "operation": op,
@@ -202,216 +245,56 @@ def chad_execute_plan(
             )
             continue
 
-        # Decide how to handle non-existent files based on the operation.
-        # Some ops (create_or_overwrite_file, replace, append_to_bottom) can
-        # legitimately create a new file; others (like prepend_comment) require it.
-        if target_path.exists():
-            try:
-                original = target_path.read_text(encoding="utf-8", errors="replace")
-            except OSError:
-                edit_logs.append(
-                    {
-                        "file": file_rel,
-                        "operation": op,
-                        "reason": "could not read target file from disk",
-                    }
-                )
-                continue
-        else:
-            if op in ("create_or_overwrite_file", "replace", "append_to_bottom"):
-                # Treat this as creating a new file; original content is empty.
-                original = ""
-            else:
-                edit_logs.append(
-                    {
-                        "file": file_rel,
-                        "operation": op,
-                        "reason": "target file does not exist on disk",
-                    }
-                )
-                continue
-
-        if op == "create_or_overwrite_file":
-            new_text = normalize_newlines(content)
-
-            if contains_suspicious_control_chars(new_text):
-                cleaned = strip_suspicious_control_chars(new_text)
-                edit_logs.append(
-                    {
-                        "file": file_rel,
-                        "operation": op,
-                        "reason": (
-                            "new content contained suspicious control characters "
-                            "which were stripped"
-                        ),
-                    }
-                )
-                new_text = cleaned
-
-            norm_old = normalize_newlines(original)
-            norm_new = new_text
-            if norm_old == norm_new:
-                edit_logs.append(
-                    {
-                        "file": file_rel,
-                        "operation": op,
-                        "reason": "new content is identical to existing file",
-                    }
-                )
-                continue
-
-            safe_write_text(target_path, new_text)
-            touched.append(str(target_path.relative_to(project_root)))
-            edit_logs.append(
-                {
-                    "file": file_rel,
-                    "operation": op,
-                    "reason": "file overwritten with new content",
-                }
+        targets[index] = target_path
+        groups.setdefault(target_path, []).append(index)
+
+    def run_group(indices: list[int]) -> None:
+        # Edits to one file stay sequential and in plan order, and share one
+        # project-relative display path for touched_files.
+        rel_display = str(targets[indices[0]].relative_to(project_root))
+        for index in indices:
+            edit = edits[index]
+            _apply_edit(
+                edit["file"],
+                edit["operation"],
+                edit.get("content", ""),
+                targets[index],
+                rel_display=rel_display,
+                known_contents=known_contents,
+                edit_logs=slot_logs[index],
+                touched=slot_touched[index],
             )
 
-        elif op == "replace":
-            # Overwrite the entire file contents with `content`.
-            new_text = normalize_newlines(content)
-
-            if contains_suspicious_control_chars(new_text):
-                cleaned = strip_suspicious_control_chars(new_text)
-                edit_logs.append(
-                    {
-                        "file": file_rel,
-                        "operation": op,
-                        "reason": (
-                            "new content contained suspicious control characters "
-                            "which were stripped"
-                        ),
-                    }
-                )
-                new_text = cleaned
-
-            norm_old = normalize_newlines(original)
-            norm_new = new_text
-            if norm_old == norm_new:
-                edit_logs.append(
-                    {
-                        "file": file_rel,
-                        "operation": op,
-                        "reason": "replace produced no effective change",
-                    }
-                )
-                continue
-
-            safe_write_text(target_path, new_text)
-            touched.append(str(target_path.relative_to(project_root)))
-            edit_logs.append(
-                {
-                    "file": file_rel,
-                    "operation": op,
-                    "reason": "file replaced with new content",
-                }
-            )
-
-        elif op == "append_to_bottom":
-            new_text_raw = original.rstrip() + "\n\n" + content + "\n"
-            new_text = normalize_newlines(new_text_raw)
-
-            if contains_suspicious_control_chars(new_text):
-                cleaned = strip_suspicious_control_chars(new_text)
-                edit_logs.append(
-                    {
-                        "file": file_rel,
-                        "operation": op,
-                        "reason": (
-                            "resulting content contained suspicious control "
-                            "characters which were stripped"
-                        ),
-                    }
-                )
-                new_text = cleaned
-
-            norm_old = normalize_newlines(original)
-            norm_new = new_text
-            if norm_old == norm_new:
-                edit_logs.append(
-                    {
-                        "file": file_rel,
-                        "operation": op,
-                        "reason": "append produced no effective change",
-                    }
-                )
-                continue
-
-            safe_write_text(target_path, new_text)
-            touched.append(str(target_path.relative_to(project_root)))
-            edit_logs.append(
-                {
-                    "file": file_rel,
-                    "operation": op,
-                    "reason": "content appended to bottom of file",
-                }
-            )
-
-        elif op == "prepend_comment":
-            prefix = detect_comment_prefix(target_path)
-            new_text_raw = f"{prefix}{content}\n\n{original}"
-            new_text = normalize_newlines(new_text_raw)
-
-            if contains_suspicious_control_chars(new_text):
-                cleaned = strip_suspicious_control_chars(new_text)
-                edit_logs.append(
-                    {
-                        "file": file_rel,
-                        "operation": op,
-                        "reason": (
-                            "resulting content contained suspicious control "
-                            "characters which were stripped"
-                        ),
-                    }
-                )
-                new_text = cleaned
-
-            norm_old = normalize_newlines(original)
-            norm_new = new_text
-            if norm_old == norm_new:
-                edit_logs.append(
-                    {
-                        "file": file_rel,
-                        "operation": op,
-                        "reason": "prepend produced no effective change",
-                    }
-                )
-                continue
-
-            safe_write_text(target_path, new_text)
-            touched.append(str(target_path.relative_to(project_root)))
-            edit_logs.append(
-                {
-                    "file": file_rel,
-                    "operation": op,
-                    "reason": "comment line prepended to file",
-                }
-            )
+    # Distinct files are independent, so overlap their read/write I/O.
+    if len(groups) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, len(groups))) as pool:
+            list(pool.map(run_group, groups.values()))
+    else:
+        for indices in groups.values():
+            run_group(indices)
 
-        else:
-            edit_logs.append(
-                {
-                    "file": file_rel,
-                    "operation": op,
-                    "reason": f"unknown operation {op!r}",
-                }
-            )
+    # Merge per-edit results back in plan order, whatever order they ran in.
+    for index in range(len(edits)):
+        edit_logs.extend(slot_logs[index])
+        touched.extend(slot_touched[index])
 
     scratch_file = scratch_dir / f"{base}.txt"
-    scratch_file.write_text(
-        "GhostFrog Chad execution\n"
-        f"ID: {base}\n"
-        f"Time: {now}\n"
-        "Touched files:\n"
-        + ("\n".join(touched) if touched else "(none)")
-        + "\n\nEdit logs:\n"
-        + (json.dumps(edit_logs, indent=2) if edit_logs else "(none)")
-        + "\n",
-        encoding="utf-8",
-    )
+    # Built as bytes parts and written with a single write(): the edit logs
+    # are already UTF-8 JSON bytes, so they are never decoded/re-encoded.
+    touched_block = "\n".join(touched) if touched else "(none)"
+    scratch_parts: list[bytes] = [
+        (
+            "GhostFrog Chad execution\n"
+            f"ID: {base}\n"
+            f"Time: {now}\n"
+            "Touched files:\n"
+            f"{touched_block}\n"
+            "\nEdit logs:\n"
+        ).encode("utf-8"),
+        jsonio.dumps_bytes(edit_logs, indent=True) if edit_logs else b"(none)",
+        b"\n",
+    ]
+    write_file_bytes(scratch_file, b"".join(scratch_parts))
 
     if touched:
         message = "Chad executed Bob's plan and modified files."
@@ -438,5 +321,146 @@ def chad_execute_plan(
     }
 
     exec_path = queue_dir / f"{base}.exec.json"
-    exec_path.write_text(json.dumps(exec_report, indent=2), encoding="utf-8")
+    write_file_bytes(exec_path, jsonio.dumps_bytes(exec_report))
     return exec_report
+
+
+# ---------------------------------------------------------------------------
+# Codemod helpers
+# ---------------------------------------------------------------------------
+
+def _unchanged(original: str, new_text: str) -> bool:
+    """
+    True if new_text (already LF-normalised) equals original up to newlines.
+
+    The plain comparison settles it unless original contains '\r' (str ==
+    bails out on a length mismatch before touching any characters); only
+    then is original normalised and compared again.
+    """
+    if original == new_text:
+        return True
+    return "\r" in original and normalize_newlines(original) == new_text
+
+
+def _apply_edit(
+    file_rel: str,
+    op: str,
+    content: str,
+    target_path: Path,
+    *,
+    rel_display: str,
+    known_contents: Dict[Path, str],
+    edit_logs: list[dict],
+    touched: list[str],
+) -> None:
+    """
+    Apply one codemod edit to target_path (already resolved inside the jail),
+    appending its log entries to edit_logs and, if the file was written,
+    rel_display (its project-relative path) to touched.
+    """
+
+    def _log(reason: str) -> None:
+        edit_logs.append({"file": file_rel, "operation": op, "reason": reason})
+
+    # Decide how to handle non-existent files based on the operation.
+    # Some ops (create_or_overwrite_file, replace, append_to_bottom) can
+    # legitimately create a new file; others (like prepend_comment) require it.
+    # Just try the read (no exists() pre-check): a missing file surfaces
+    # as FileNotFoundError, saving a stat() per edit.
+    try:
+        original = known_contents.get(target_path)
+        if original is None:
+            original = target_path.read_text(encoding="utf-8", errors="replace")
+    except FileNotFoundError:
+        if op in ("create_or_overwrite_file", "replace", "append_to_bottom"):
+            # Treat this as creating a new file; original content is empty.
+            original = ""
+        else:
+            _log("target file does not exist on disk")
+            return
+    except OSError:
+        _log("could not read target file from disk")
+        return
+
+    if op == "create_or_overwrite_file":
+        new_text = normalize_newlines(content)
+
+        new_text, stripped = sanitize_control_chars(new_text)
+        if stripped:
+            _log(
+                "new content contained suspicious control characters "
+                "which were stripped"
+            )
+
+        if _unchanged(original, new_text):
+            _log("new content is identical to existing file")
+            return
+
+        safe_write_text(target_path, new_text)
+        known_contents[target_path] = new_text
+        touched.append(rel_display)
+        _log("file overwritten with new content")
+
+    elif op == "replace":
+        # Overwrite the entire file contents with `content`.
+        new_text = normalize_newlines(content)
+
+        new_text, stripped = sanitize_control_chars(new_text)
+        if stripped:
+            _log(
+                "new content contained suspicious control characters "
+                "which were stripped"
+            )
+
+        if _unchanged(original, new_text):
+            _log("replace produced no effective change")
+            return
+
+        safe_write_text(target_path, new_text)
+        known_contents[target_path] = new_text
+        touched.append(rel_display)
+        _log("file replaced with new content")
+
+    elif op == "append_to_bottom":
+        new_text_raw = original.rstrip() + "\n\n" + content + "\n"
+        new_text = normalize_newlines(new_text_raw)
+
+        new_text, stripped = sanitize_control_chars(new_text)
+        if stripped:
+            _log(
+                "resulting content contained suspicious control "
+                "characters which were stripped"
+            )
+
+        if _unchanged(original, new_text):
+            _log("append produced no effective change")
+            return
+
+        safe_write_text(target_path, new_text)
+        known_contents[target_path] = new_text
+        touched.append(rel_display)
+        _log("content appended to bottom of file")
+
+    elif op == "prepend_comment":
+        prefix = detect_comment_prefix(target_path)
+        new_text_raw = f"{prefix}{content}\n\n{original}"
+        new_text = normalize_newlines(new_text_raw)
+
+        new_text, stripped = sanitize_control_chars(new_text)
+        if stripped:
+            _log(
+                "resulting content contained suspicious control "
+                "characters which were stripped"
+            )
+
+        if _unchanged(original, new_text):
+            _log("prepend produced no effective change")
+            return
+
+        safe_write_text(target_path, new_text)
+        known_contents[target_path] = new_text
+        touched.append(rel_display)
+        _log("comment line prepended to file")
+
+    else:
+        _log(f"unknown operation {op!r}")
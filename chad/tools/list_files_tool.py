@@ -1,6 +1,7 @@
 # chad/tools/list_files_tool.py
 from __future__ import annotations
 
+import os
 from pathlib import Path
 from typing import Any, Dict, Tuple, List
 
@@ -9,6 +10,60 @@ from helpers.jail import resolve_in_project_jail
 from . import register_tool, ToolResult
 
 
+def _scan_entries(
+    base_path: Path,
+    project_root: Path,
+    recursive: bool,
+    max_entries: int,
+) -> List[Dict[str, Any]]:
+    """
+    List up to max_entries entries under base_path with os.scandir.
+
+    DirEntry caches the file type from the directory read, so only regular
+    files cost an extra stat() (for their size). Recursive mode walks
+    depth-first with an explicit stack, does not descend into symlinked
+    directories, and stops as soon as max_entries is reached.
+    """
+    entries: List[Dict[str, Any]] = []
+
+    base_rel = os.path.relpath(base_path, project_root)
+    prefix = "" if base_rel == os.curdir else base_rel + os.sep
+
+    stack = [(str(base_path), prefix)]
+    while stack and len(entries) < max_entries:
+        dir_path, rel_prefix = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                dir_entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in dir_entries:
+            if len(entries) >= max_entries:
+                break
+            rel = rel_prefix + entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                entries.append({"path": rel, "type": "dir", "size": None})
+                if recursive and not entry.is_symlink():
+                    subdirs.append((entry.path, rel + os.sep))
+            else:
+                try:
+                    size = entry.stat().st_size
+                except OSError:
+                    size = None
+                entries.append({"path": rel, "type": "file", "size": size})
+
+        # Reverse so the stack pops subdirectories in name order.
+        stack.extend(reversed(subdirs))
+
+    return entries
+
+
 def _run_list_files(
     args: Dict[str, Any],
     project_root: Path,
@@ -31,42 +86,9 @@ def _run_list_files(
         return "", message
 
     entries: List[Dict[str, Any]] = []
-    count = 0
 
-    if recursive and base_path.is_dir():
-        for path in base_path.rglob("*"):
-            if count >= max_entries:
-                break
-            try:
-                rel = str(path.relative_to(project_root))
-            except ValueError:
-                continue
-            if path.is_dir():
-                entries.append({"path": rel, "type": "dir", "size": None})
-            else:
-                try:
-                    size = path.stat().st_size
-                except OSError:
-                    size = None
-                entries.append({"path": rel, "type": "file", "size": size})
-            count += 1
-    elif base_path.is_dir():
-        for path in sorted(base_path.iterdir()):
-            if count >= max_entries:
-                break
-            try:
-                rel = str(path.relative_to(project_root))
-            except ValueError:
-                continue
-            if path.is_dir():
-                entries.append({"path": rel, "type": "dir", "size": None})
-            else:
-                try:
-                    size = path.stat().st_size
-                except OSError:
-                    size = None
-                entries.append({"path": rel, "type": "file", "size": size})
-            count += 1
+    if base_path.is_dir():
+        entries = _scan_entries(base_path, project_root, recursive, max_entries)
     else:
         try:
             rel = str(base_path.relative_to(project_root))
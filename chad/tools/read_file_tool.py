@@ -1,10 +1,13 @@
 # chad/tools/read_file_tool.py
 from __future__ import annotations
 
+import os
+import stat
 from pathlib import Path
 from typing import Any, Dict, Tuple
 
 from helpers.jail import resolve_in_project_jail
+from helpers.text import read_text_head
 
 from . import register_tool, ToolResult
 
@@ -25,26 +28,38 @@ def _run_read_file(
     except (TypeError, ValueError):
         max_chars = 16000
 
+    missing_message = (
+        f"Chad tried to read_file {rel_path!r} but it does not exist "
+        "or is outside the project jail."
+    )
     target_path = resolve_in_project_jail(rel_path, project_root)
-    if target_path is None or not target_path.exists() or not target_path.is_file():
-        message = (
-            f"Chad tried to read_file {rel_path!r} but it does not exist, "
-            "is not a file, or is outside the project jail."
-        )
-        return "", message
+    if target_path is None:
+        return "", missing_message
+
+    # One stat, so a FIFO or device is refused before open() could block on it.
+    try:
+        st = os.stat(target_path)
+    except FileNotFoundError:
+        return "", missing_message
+    except OSError as e:
+        return "", f"Chad tried to read_file {rel_path!r} but could not: {e.strerror}."
+    if not stat.S_ISREG(st.st_mode):
+        return "", f"Chad tried to read_file {rel_path!r} but it is not a regular file."
 
     try:
-        raw = target_path.read_text(encoding="utf-8")
+        head, truncated = read_text_head(target_path, max_chars)
+    except OSError as e:
+        return "", f"Chad tried to read_file {rel_path!r} but could not: {e.strerror}."
     except UnicodeDecodeError:
         message = (
             f"Chad tried to read_file {rel_path!r} but it is not UTF-8 text."
         )
         return "", message
 
-    if len(raw) > max_chars:
-        tool_result = raw[:max_chars] + "\n\n... (truncated)"
+    if truncated:
+        tool_result = head + "\n\n... (truncated)"
     else:
-        tool_result = raw
+        tool_result = head
     message = f"Chad read_file {rel_path!r} (up to {max_chars} chars)."
     return tool_result, message
 
@@ -1,18 +1,150 @@
 from __future__ import annotations
 
-import mimetypes
+import atexit
 import os
-import smtplib
-from email.message import EmailMessage
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
-from dotenv import load_dotenv
-load_dotenv()
+# smtplib / email / mimetypes are imported inside _run_send_email (and
+# _send_message): smtplib drags in email.utils, email.generator and friends,
+# paid at every app start for a tool that is rarely called.
+if TYPE_CHECKING:
+    from email.message import EmailMessage
+
+from helpers.env import load_env
+load_env()
 
 from helpers.jail import resolve_in_project_jail
+from helpers.text import read_bytes_files
 from . import register_tool, ToolResult
 
+# ---------------------------------------------------------------------------
+# Persistent SMTP connection
+# ---------------------------------------------------------------------------
+#
+# Connecting means TCP + TLS + AUTH, several round trips per email. We keep
+# one logged-in connection around (per SMTP class/host/port/security/creds)
+# for up to _SMTP_MAX_AGE seconds, check it with NOOP before reuse, and
+# reconnect + retry once if a reused connection turns out to be dead.
+
+_SMTP_MAX_AGE = 300.0
+
+SmtpKey = Tuple[Any, str, int, str, Optional[str], Optional[str]]
+
+_smtp_lock = threading.Lock()
+_smtp_conn: Any = None
+_smtp_conn_key: Optional[SmtpKey] = None
+_smtp_conn_born = 0.0
+
+
+def _smtp_connect(key: SmtpKey) -> Any:
+    smtp_cls, host, port, security, user, password = key
+    server = smtp_cls(host, port, timeout=30)
+    try:
+        if security == "starttls":
+            # Keep this simple so tests' FakeSMTP/_DummySMTP work
+            server.starttls()
+        if user and password:
+            server.login(user, password)
+    except Exception:
+        _smtp_quit(server)
+        raise
+    return server
+
+
+def _smtp_quit(server: Any) -> None:
+    try:
+        server.quit()
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def _smtp_alive(server: Any) -> bool:
+    try:
+        return server.noop()[0] == 250
+    except Exception:  # noqa: BLE001  (dead socket, or a client without noop)
+        return False
+
+
+def _smtp_drop() -> None:
+    """Close and forget the cached connection. Caller holds _smtp_lock."""
+    global _smtp_conn, _smtp_conn_key
+    if _smtp_conn is not None:
+        _smtp_quit(_smtp_conn)
+    _smtp_conn = None
+    _smtp_conn_key = None
+
+
+def _send_message(msg: EmailMessage, key: SmtpKey) -> None:
+    """Send `msg` over the cached connection for `key`, reconnecting as needed."""
+    global _smtp_conn, _smtp_conn_key, _smtp_conn_born
+    import smtplib
+
+    with _smtp_lock:
+        reused = (
+            _smtp_conn is not None
+            and _smtp_conn_key == key
+            and time.monotonic() - _smtp_conn_born < _SMTP_MAX_AGE
+            and _smtp_alive(_smtp_conn)
+        )
+        if not reused:
+            _smtp_drop()
+            _smtp_conn = _smtp_connect(key)
+            _smtp_conn_key = key
+            _smtp_conn_born = time.monotonic()
+
+        try:
+            _smtp_conn.send_message(msg)
+        except (smtplib.SMTPException, OSError):
+            _smtp_drop()
+            if not reused:
+                raise
+            # The cached connection went stale between NOOP and send: retry
+            # once on a fresh one.
+            _smtp_conn = _smtp_connect(key)
+            _smtp_conn_key = key
+            _smtp_conn_born = time.monotonic()
+            _smtp_conn.send_message(msg)
+
+
+def _smtp_close_at_exit() -> None:
+    with _smtp_lock:
+        _smtp_drop()
+
+
+atexit.register(_smtp_close_at_exit)
+
+
+def _latest_markdown_note(notes_dir: Path) -> Optional[Path]:
+    """
+    Return the most recently modified *.md file directly in notes_dir.
+
+    Uses a single os.scandir pass; DirEntry.stat() results are cached per
+    entry. Returns None if the directory is missing or has no notes.
+    """
+    latest: Optional[os.DirEntry] = None
+    latest_mtime = float("-inf")
+    try:
+        with os.scandir(notes_dir) as it:
+            for entry in it:
+                # is_file() comes from the directory read (d_type): no stat.
+                if not entry.name.endswith(".md") or not entry.is_file():
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                if mtime > latest_mtime:
+                    latest = entry
+                    latest_mtime = mtime
+    except OSError:
+        return None
+
+    return Path(latest.path) if latest is not None else None
+
+
 def _run_send_email(
     args: Dict[str, Any],
     project_root: Path,
@@ -62,16 +194,7 @@ def _run_send_email(
 
     # Auto-attach most recent markdown note if none supplied at all
     if not attachments and not attachments_in_args:
-        latest = None
-        latest_mtime = None
-        for p in notes_dir.glob("*.md"):
-            try:
-                mtime = p.stat().st_mtime
-            except OSError:
-                continue
-            if latest is None or mtime > latest_mtime:
-                latest = p
-                latest_mtime = mtime
+        latest = _latest_markdown_note(notes_dir)
 
         if latest is not None:
             auto_note = True
@@ -86,6 +209,17 @@ def _run_send_email(
             if not subject:
                 subject = f"[GhostFrog] {latest.name}"
 
+    # Read the auto-attached note once: the same bytes are attached and
+    # used for the preview in the tool result.
+    note_bytes: Optional[bytes] = None
+    note_resolved: Optional[Path] = None
+    if auto_note and note_path is not None:
+        note_resolved = note_path.resolve()
+        try:
+            note_bytes = note_resolved.read_bytes()
+        except OSError:
+            note_bytes = None
+
     # ------------------------------------------------------------------
     # SMTP config
     # ------------------------------------------------------------------
@@ -123,60 +257,75 @@ def _run_send_email(
     # ------------------------------------------------------------------
     # Send email
     # ------------------------------------------------------------------
+    import mimetypes
+    import smtplib
+    from email.message import EmailMessage
+
     try:
         if security == "ssl":
             smtp_cls = smtplib.SMTP_SSL
         else:
             smtp_cls = smtplib.SMTP
 
-        with smtp_cls(smtp_host, smtp_port, timeout=30) as server:
-            if security == "starttls":
-                # Keep this simple so tests' FakeSMTP/_DummySMTP work
-                server.starttls()
-            if smtp_user and smtp_password:
-                server.login(smtp_user, smtp_password)
-
-            msg = EmailMessage()
-            msg["From"] = from_addr
-            msg["To"] = to_addr  # ignore args["to"], always force env
-            msg["Subject"] = subject or "(no subject)"
-            msg.set_content(body or "")
-
-            # Attach any files if requested / auto-note attached
-            for rel in attachments:
-                rel_str = str(rel)
-                attach_path = resolve_in_project_jail(rel_str, project_root)
-                if attach_path is None or not attach_path.exists():
-                    continue
-                mime_type, _ = mimetypes.guess_type(str(attach_path))
-                if mime_type:
-                    maintype, subtype = mime_type.split("/", 1)
-                else:
-                    maintype, subtype = "application", "octet-stream"
-                with attach_path.open("rb") as f:
-                    data = f.read()
-                msg.add_attachment(
-                    data,
-                    maintype=maintype,
-                    subtype=subtype,
-                    filename=attach_path.name,
-                )
-
-            server.send_message(msg)
+        msg = EmailMessage()
+        msg["From"] = from_addr
+        msg["To"] = to_addr  # ignore args["to"], always force env
+        msg["Subject"] = subject or "(no subject)"
+        msg.set_content(body or "")
+
+        # Attach any files if requested / auto-note attached. Resolve them
+        # all first, then read the ones we don't already hold concurrently.
+        attach_paths = []
+        for rel in attachments:
+            attach_path = resolve_in_project_jail(str(rel), project_root)
+            if attach_path is not None:
+                attach_paths.append(attach_path)
+
+        blobs = read_bytes_files({
+            str(p): p
+            for p in attach_paths
+            if note_bytes is None or p != note_resolved
+        })
+        if note_bytes is not None:
+            blobs[str(note_resolved)] = note_bytes
+
+        for attach_path in attach_paths:
+            data = blobs.get(str(attach_path))
+            if data is None:  # missing or unreadable: skip, as before
+                continue
+            mime_type, _ = mimetypes.guess_type(str(attach_path))
+            if mime_type:
+                maintype, subtype = mime_type.split("/", 1)
+            else:
+                maintype, subtype = "application", "octet-stream"
+            msg.add_attachment(
+                data,
+                maintype=maintype,
+                subtype=subtype,
+                filename=attach_path.name,
+            )
+
+        _send_message(
+            msg,
+            (smtp_cls, smtp_host, smtp_port, security, smtp_user, smtp_password),
+        )
 
         # ------------------------------------------------------------------
         # Tool result text
         # ------------------------------------------------------------------
         if auto_note and note_path is not None:
-            try:
-                raw = note_path.read_text(encoding="utf-8")
-            except Exception:
+            if note_bytes is None:
                 preview_body = "(could not read note content)"
             else:
-                if len(raw) > 16000:
-                    preview_body = raw[:16000] + "\n\n... (truncated)"
+                try:
+                    raw = note_bytes.decode("utf-8")
+                except UnicodeDecodeError:
+                    preview_body = "(could not read note content)"
                 else:
-                    preview_body = raw
+                    if len(raw) > 16000:
+                        preview_body = raw[:16000] + "\n\n... (truncated)"
+                    else:
+                        preview_body = raw
 
             display_name = note_rel_display or note_path.name
             tool_result = (
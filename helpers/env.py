@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+"""
+helpers/env.py
+
+One place that loads the project's .env into os.environ.
+
+app.py, bob/config.py and the send_email tool all need the .env values at
+import time. Each used to call load_dotenv() itself, so every interpreter
+(the server, each `python -m meta` repair child, every test run) located and
+parsed .env three times. load_env() does it once per process.
+"""
+
+import threading
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# AI_ROOT is the project root where app.py lives
+AI_ROOT = Path(__file__).resolve().parent.parent
+ENV_FILE = AI_ROOT / ".env"
+
+_lock = threading.Lock()
+_loaded = False
+
+
+def load_env() -> None:
+    """
+    Load AI_ROOT/.env into os.environ the first time it is called; later
+    calls are no-ops. Existing environment variables win, as with a plain
+    load_dotenv().
+    """
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            # An explicit path skips find_dotenv()'s caller-frame and
+            # directory walk; it resolves to the same project-root .env.
+            load_dotenv(ENV_FILE)
+            _loaded = True
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import os
+from functools import lru_cache
 from pathlib import Path
 
 # assume PROJECT_ROOT is imported or defined in this module
 # from app import PROJECT_ROOT  # or defined above
 
 
+@lru_cache(maxsize=8)
+def _jail_prefixes(project_root: Path) -> tuple[str, str]:
+    """(root itself, root + separator) as strings, for prefix checks."""
+    root_str = str(project_root)
+    return root_str, root_str.rstrip(os.sep) + os.sep
+
+
 def resolve_in_project_jail(
     relative_path: str,
     project_root: Path | None = None,
@@ -15,10 +24,14 @@ def resolve_in_project_jail(
 
     If project_root is not provided, fall back to the global PROJECT_ROOT.
     Returns None if the resolved path escapes the jail.
-    """
-    from app import PROJECT_ROOT as APP_PROJECT_ROOT  # if needed to avoid circulars
 
+    The containment check is a plain string-prefix comparison on the
+    resolved path (resolve() still follows symlinks and collapses '..'),
+    which avoids relative_to()'s exception-based control flow.
+    """
     if not project_root:
+        from app import PROJECT_ROOT as APP_PROJECT_ROOT  # if needed to avoid circulars
+
         project_root = APP_PROJECT_ROOT
 
     if not relative_path:
@@ -26,10 +39,10 @@ def resolve_in_project_jail(
 
     target = (project_root / relative_path).resolve()
 
-    try:
-        target.relative_to(project_root)
-    except ValueError:
-        # Escapes the jail -> reject
-        return None
+    root_str, root_prefix = _jail_prefixes(project_root)
+    target_str = str(target)
+    if target_str == root_str or target_str.startswith(root_prefix):
+        return target
 
-    return target
\ No newline at end of file
+    # Escapes the jail -> reject
+    return None
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+"""
+helpers/jsonio.py
+
+JSON encode/decode for the Bob/Chad hot path (model replies, plan and exec
+reports). Uses orjson when it is installed and falls back to the stdlib
+json module otherwise, so orjson stays an optional speed-up.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None  # type: ignore[assignment]
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON text. Raises json.JSONDecodeError on invalid input (orjson's
+    JSONDecodeError is a subclass of it).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, *, indent: bool = False) -> bytes:
+    """
+    Serialise `obj` to UTF-8 JSON bytes, optionally indented by 2 spaces.
+    Non-ASCII text is written as-is (not \\u-escaped) on both code paths.
+
+    Falls back to the stdlib for objects orjson refuses (e.g. non-str keys).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass
+    return json.dumps(
+        obj, indent=2 if indent else None, ensure_ascii=False
+    ).encode("utf-8")
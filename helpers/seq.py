@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+"""
+helpers/seq.py
+
+Monotonic message-sequence allocation backed by a plain text file
+(data/seq.txt holds the last id handed out, e.g. "42").
+
+The read → increment → write cycle runs under an exclusive flock on a
+sidecar lock file (seq.txt.lock), so concurrent Flask requests and the meta
+CLI (a separate process) can never hand out the same id twice. The new value
+is written to a temp file, fsync()ed and os.replace()d over seq.txt, so a
+crash mid-write leaves either the old or the new value, never a torn/empty
+file.
+
+The lock lives on a separate file on purpose: os.replace swaps seq.txt's
+inode, and a flock held on the old inode would not exclude the next writer.
+The same property lets a process skip re-reading seq.txt when the inode is
+still the one it installed itself (one stat instead of open/read/parse).
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+try:  # POSIX only; on Windows we fall back to the in-process lock.
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+_thread_lock = threading.Lock()
+
+# Per seq file: (identity, value) of the last file this process installed.
+# Every os.replace gives seq.txt a new inode, so if the identity is unchanged
+# nobody else has written since and the value needs no re-read. mtime and
+# size ride along with the inode in case a freed inode number is recycled.
+_last_written: Dict[str, Tuple[Tuple[int, int, int, int], int]] = {}
+
+
+def _identity(st: os.stat_result) -> Tuple[int, int, int, int]:
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _read_counter(seq_file: Path) -> int:
+    """Current value of `seq_file`; missing, empty or corrupt counts as 0."""
+    try:
+        st = os.stat(seq_file)
+    except FileNotFoundError:
+        return 0
+    cached = _last_written.get(str(seq_file))
+    if cached is not None and cached[0] == _identity(st):
+        return cached[1]
+
+    try:
+        fd = os.open(seq_file, os.O_RDONLY)
+    except FileNotFoundError:
+        return 0
+    try:
+        raw = os.read(fd, 64)
+    finally:
+        os.close(fd)
+    try:
+        return int(raw.decode("ascii").strip() or "0")
+    except ValueError:
+        return 0
+
+
+def _replace_counter(seq_file: Path, value: int) -> None:
+    """Atomically swap `seq_file` for one containing `value`."""
+    tmp = seq_file.with_name(f"{seq_file.name}.tmp.{os.getpid()}")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, str(value).encode("ascii"))
+        # Data must hit the disk before the rename does; otherwise a crash
+        # can leave seq.txt pointing at an empty file (delayed allocation),
+        # which reads back as 0 and rewinds every id.
+        os.fsync(fd)
+        st = os.fstat(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, seq_file)
+    _last_written[str(seq_file)] = (_identity(st), value)
+
+
+def allocate_sequence(seq_file: Path, count: int = 1) -> int:
+    """
+    Atomically advance the counter stored in `seq_file` by `count` and
+    return the new (last) value; the caller owns the `count` ids ending at
+    it, i.e. range(result - count + 1, result + 1).
+
+    A missing, empty or corrupt file counts as 0, so the first id is 1.
+    """
+    if count < 1:
+        raise ValueError(f"count must be >= 1, got {count}")
+    lock_path = seq_file.with_name(f"{seq_file.name}.lock")
+    with _thread_lock:
+        lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX)
+
+            new_val = _read_counter(seq_file) + count
+            _replace_counter(seq_file, new_val)
+            return new_val
+        finally:
+            # Closing the descriptor also releases the flock.
+            os.close(lock_fd)
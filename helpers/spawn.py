@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+"""
+helpers/spawn.py
+
+Fire-and-forget child processes without a Python thread per child.
+
+spawn_background() starts the command with Popen and hands the child to a
+single shared reaper thread. On Linux the reaper waits on pidfds
+(os.pidfd_open) through a selector, so any number of concurrent children
+cost one thread in total. Where pidfd_open is unavailable (macOS, older
+kernels) we fall back to a small daemon thread per child that just waits.
+"""
+
+import os
+import selectors
+import subprocess
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+OnExit = Optional[Callable[[subprocess.Popen], None]]
+
+
+class _Reaper:
+    """
+    One daemon thread that reaps every child registered via watch().
+
+    New children are queued under a lock and the thread is woken through a
+    self-pipe, so the selector is only ever touched from the reaper thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[subprocess.Popen, OnExit]] = []
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_w: Optional[int] = None
+
+    def _start(self) -> None:
+        self._selector = selectors.DefaultSelector()
+        wake_r, self._wake_w = os.pipe()
+        self._selector.register(wake_r, selectors.EVENT_READ, None)
+        threading.Thread(
+            target=self._loop, name="bob-reaper", daemon=True
+        ).start()
+
+    def watch(self, proc: subprocess.Popen, on_exit: OnExit = None) -> None:
+        if not hasattr(os, "pidfd_open"):
+            _wait_in_thread(proc, on_exit)
+            return
+
+        with self._lock:
+            if self._selector is None:
+                self._start()
+            self._pending.append((proc, on_exit))
+        os.write(self._wake_w, b"\0")
+
+    def _register_pending(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for proc, on_exit in pending:
+            try:
+                fd = os.pidfd_open(proc.pid)
+            except OSError:
+                # e.g. ENOSYS on kernels without pidfd support.
+                _wait_in_thread(proc, on_exit)
+                continue
+            self._selector.register(fd, selectors.EVENT_READ, (proc, on_exit))
+
+    def _loop(self) -> None:
+        while True:
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    os.read(key.fd, 512)
+                    self._register_pending()
+                    continue
+
+                # pidfd readable → child exited; collect it so it isn't a zombie.
+                self._selector.unregister(key.fd)
+                os.close(key.fd)
+                proc, on_exit = key.data
+                proc.wait()
+                _notify(proc, on_exit)
+
+
+def _notify(proc: subprocess.Popen, on_exit: OnExit) -> None:
+    if on_exit is None:
+        return
+    try:
+        on_exit(proc)
+    except Exception:  # noqa: BLE001
+        # A broken callback must not take the reaper thread down with it.
+        pass
+
+
+def _wait_in_thread(proc: subprocess.Popen, on_exit: OnExit = None) -> None:
+    def run() -> None:
+        proc.wait()
+        _notify(proc, on_exit)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+_reaper = _Reaper()
+
+
+def spawn_background(
+    cmd: Sequence[str], cwd: Path, *, on_exit: OnExit = None
+) -> subprocess.Popen:
+    """
+    Start `cmd` in `cwd` without waiting for it; the exit status is reaped
+    in the background. Raises OSError if the process cannot be started.
+
+    on_exit(proc), if given, is called from the reaper once the child has
+    been reaped; keep it short, it runs on the shared reaper thread.
+    """
+    proc = subprocess.Popen(list(cmd), cwd=str(cwd))
+    _reaper.watch(proc, on_exit)
+    return proc
@@ -1,7 +1,43 @@
 from __future__ import annotations
 
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+# Control characters below ASCII 32 other than \t, \n and \r.
+_SUSPICIOUS_CTRL = "".join(chr(i) for i in range(32) if chr(i) not in "\t\n\r")
+_CTRL_TABLE = str.maketrans("", "", _SUSPICIOUS_CTRL)
+_CTRL_RE = re.compile(f"[{re.escape(_SUSPICIOUS_CTRL)}]")
+_CRLF_RE = re.compile(r"\r\n?")
+
+# File extension → line-comment prefix (anything else gets "# ").
+_COMMENT_PREFIXES = {
+    ".py": "# ",
+    ".sh": "# ",
+    ".js": "// ",
+    ".ts": "// ",
+    ".jsx": "// ",
+    ".tsx": "// ",
+    ".c": "// ",
+    ".cpp": "// ",
+    ".h": "// ",
+    ".php": "// ",
+}
+
+# Runs of anything that isn't a (Unicode) letter or digit.
+_SLUG_RE = re.compile(r"[\W_]+")
+
+
+def _strip_ctrl(text: str) -> str:
+    # str.translate has a fast path for pure-ASCII input only; on text with
+    # any non-ASCII character it falls back to a per-character dict lookup,
+    # ~15x slower than the regex. isascii() is O(1) (a flag on the string).
+    if text.isascii():
+        return text.translate(_CTRL_TABLE)
+    return _CTRL_RE.sub("", text)
 
 
 def normalize_newlines(text: str) -> str:
@@ -17,7 +53,10 @@ def normalize_newlines(text: str) -> str:
     Returns:
         A string where all line endings are converted to '\n'.
     """
-    return text.replace("\r\n", "\n").replace("\r", "\n")
+    if "\r" not in text:
+        # Common case (already LF-only): one scan, no copy.
+        return text
+    return _CRLF_RE.sub("\n", text)
 
 
 def safe_read_text(target_path: str) -> str:
@@ -47,6 +86,120 @@ def safe_read_text(target_path: str) -> str:
         return ""
 
 
+# Shared pool for read_text_files() / read_bytes_files(); file reads release
+# the GIL.
+_READ_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="bob-read")
+
+
+def _read_text_or_none(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _read_bytes_or_none(path: Path) -> Optional[bytes]:
+    try:
+        return path.read_bytes()
+    except OSError:
+        return None
+
+
+def _read_all(
+        reader: Callable[[Path], Any], paths: Mapping[str, Path]
+) -> Dict[str, Any]:
+    if len(paths) <= 1:
+        results = [reader(p) for p in paths.values()]
+    else:
+        results = list(_READ_POOL.map(reader, paths.values()))
+    return {
+        key: data for key, data in zip(paths.keys(), results) if data is not None
+    }
+
+
+def read_text_files(paths: Mapping[str, Path]) -> Dict[str, str]:
+    """
+    Read several UTF-8 text files concurrently.
+
+    Args:
+        paths: Mapping of key (e.g. the caller's relative path) → file path.
+
+    Returns:
+        key → contents, in the input order, for every file that could be
+        read; missing, unreadable and non-UTF-8 files are left out.
+    """
+    return _read_all(_read_text_or_none, paths)
+
+
+FileStamp = Tuple[int, int]
+"""(st_mtime_ns, st_size): cheap check that a file is unchanged since read."""
+
+
+def file_stamp(st: os.stat_result) -> FileStamp:
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_text_stamped_or_none(path: Path) -> Optional[Tuple[str, FileStamp]]:
+    # fstat before reading: a write that lands mid-read changes the file's
+    # stamp afterwards, so a later stamp check can only be pessimistic.
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            st = os.fstat(f.fileno())
+            return f.read(), file_stamp(st)
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def read_text_files_stamped(
+        paths: Mapping[str, Path],
+) -> Tuple[Dict[str, str], Dict[str, FileStamp]]:
+    """
+    Like read_text_files(), but also return each file's FileStamp as of the
+    read, so a later user of the contents can check they are still current.
+
+    Returns:
+        (key → contents, key → stamp), both in input order.
+    """
+    results = _read_all(_read_text_stamped_or_none, paths)
+    texts = {key: text for key, (text, _) in results.items()}
+    stamps = {key: stamp for key, (_, stamp) in results.items()}
+    return texts, stamps
+
+
+def read_bytes_files(paths: Mapping[str, Path]) -> Dict[str, bytes]:
+    """
+    Read several files as bytes concurrently; like read_text_files(),
+    files that cannot be read are left out.
+    """
+    return _read_all(_read_bytes_or_none, paths)
+
+
+def read_text_head(path: Path, max_chars: int) -> tuple[str, bool]:
+    """
+    Read at most `max_chars` characters of a UTF-8 text file.
+
+    Text-mode read(n) decodes incrementally in small blocks, so memory stays
+    O(max_chars) no matter how large the file is (no full read_text()).
+    Newlines are translated exactly as read_text() would.
+
+    Args:
+        path: File to read.
+        max_chars: Maximum number of characters to return.
+
+    Returns:
+        (text, truncated) where truncated is True if the file has more
+        than max_chars characters.
+
+    Raises:
+        OSError / UnicodeDecodeError like Path.read_text().
+    """
+    with path.open("r", encoding="utf-8") as f:
+        text = f.read(max(max_chars, 0) + 1)
+    if len(text) > max_chars:
+        return text[:max_chars], True
+    return text, False
+
+
 def detect_comment_prefix(path: Path) -> str:
     """
     Guess a comment prefix based on file extension.
@@ -59,16 +212,7 @@ def detect_comment_prefix(path: Path) -> str:
     Returns:
         A string prefix such as "# " or "// ".
     """
-    ext = path.suffix.lower()
-
-    if ext in {".py", ".sh"}:
-        return "# "
-    if ext in {".js", ".ts", ".jsx", ".tsx", ".c", ".cpp", ".h"}:
-        return "// "
-    if ext == ".php":
-        return "// "
-
-    return "# "
+    return _COMMENT_PREFIXES.get(path.suffix.lower(), "# ")
 
 
 def slugify_for_markdown(title: str) -> str:
@@ -86,18 +230,12 @@ def slugify_for_markdown(title: str) -> str:
     Returns:
         A filesystem/markdown-safe slug string, e.g. 'error-log-20250101'.
     """
-    base = "".join(
-        ch.lower() if ch.isalnum() else "-"
-        for ch in (title or "").strip()
-    ).strip("-")
+    base = _SLUG_RE.sub("-", (title or "").strip().lower()).strip("-")
 
     if not base:
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
         return f"note-{timestamp}"
 
-    while "--" in base:
-        base = base.replace("--", "-")
-
     return base
 
 
@@ -118,10 +256,7 @@ def contains_suspicious_control_chars(text: str) -> bool:
     Returns:
         True if suspicious characters are detected, otherwise False.
     """
-    for ch in text:
-        if ord(ch) < 32 and ch not in ("\n", "\r", "\t"):
-            return True
-    return False
+    return sanitize_control_chars(text)[1]
 
 
 def strip_suspicious_control_chars(text: str) -> str:
@@ -137,11 +272,44 @@ def strip_suspicious_control_chars(text: str) -> str:
     Returns:
         Cleaned string with only safe characters preserved.
     """
-    return "".join(
-        ch
-        for ch in text
-        if not (ord(ch) < 32 and ch not in ("\n", "\r", "\t"))
-    )
+    return sanitize_control_chars(text)[0]
+
+
+def write_file_bytes(path: Path, data: bytes) -> None:
+    """
+    Write already-encoded bytes to `path` (create/truncate) with raw os.write.
+
+    Skips the TextIOWrapper/BufferedWriter layers entirely: for typical
+    payloads this is a single write() syscall between open() and close().
+
+    Args:
+        path: Target file; its parent directory must exist.
+        data: Bytes to write.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def sanitize_control_chars(text: str) -> tuple[str, bool]:
+    """
+    Strip suspicious control characters in one pass and report whether any
+    were found — replaces the contains_...() + strip_...() pair, which
+    scanned the text twice.
+
+    Args:
+        text: Input string possibly containing bad control characters.
+
+    Returns:
+        (cleaned_text, changed)
+    """
+    cleaned = _strip_ctrl(text)
+    return cleaned, len(cleaned) != len(text)
 
 
 def safe_write_text(path: Path, text: str) -> None:
@@ -167,8 +335,7 @@ def safe_write_text(path: Path, text: str) -> None:
     text = normalize_newlines(text)
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    with path.open("w", encoding="utf-8", newline="\n") as f:
-        f.write(text)
+    write_file_bytes(path, text.encode("utf-8"))
 
 
 def safe_read_file(filepath: str) -> str:
@@ -25,6 +25,7 @@ from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Iterable, List, Dict, Any, Tuple, Optional
 from bob.planner import bob_refine_codemod_with_files
+from helpers.text import read_text_files
 from .log import log_history_record
 
 logger = logging.getLogger("meta")
@@ -60,29 +61,19 @@ def _build_file_contexts_for_edits(edits: List[Dict[str, Any]]) -> Dict[str, str
     We keep it simple: read files relative to ROOT_DIR, skip missing ones,
     and optionally truncate very large files.
     """
-    file_contexts: Dict[str, str] = {}
-    seen: set[str] = set()
-
+    paths: Dict[str, Path] = {}
     for e in edits:
         rel = e.get("file")
-        if not rel or rel in seen:
-            continue
-        seen.add(rel)
+        if rel and rel not in paths:
+            paths[rel] = ROOT_DIR / rel
 
-        p = ROOT_DIR / rel
-        if not p.exists() or not p.is_file():
-            continue
+    # Read concurrently; missing/unreadable files are simply omitted.
+    file_contexts = read_text_files(paths)
 
-        try:
-            text = p.read_text(encoding="utf-8")
-        except Exception:
-            continue
-
-        # Optional: truncate to avoid gigantic prompts
+    # Optional: truncate to avoid gigantic prompts
+    for rel, text in file_contexts.items():
         if len(text) > 20000:
-            text = text[:20000] + "\n\n<!-- truncated by meta -->"
-
-        file_contexts[rel] = text
+            file_contexts[rel] = text[:20000] + "\n\n<!-- truncated by meta -->"
 
     return file_contexts
 
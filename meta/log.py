@@ -1,13 +1,14 @@
 # meta/log.py
 from __future__ import annotations
 
-import json
 import gzip
 import shutil
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from helpers import jsonio
+
 # ---------------------------------------------------------------------------
 # Paths (mirrored from meta/core.py)
 # ---------------------------------------------------------------------------
@@ -65,9 +66,8 @@ def log_history_record(
     if extra:
         record.update(extra)
 
-    with HISTORY_FILE.open("a", encoding="utf-8") as f:
-        json.dump(record, f, ensure_ascii=False)
-        f.write("\n")
+    with HISTORY_FILE.open("ab") as f:
+        f.write(jsonio.dumps_bytes(record) + b"\n")
 
     _rotate_history_if_needed()
 
@@ -1,13 +1,23 @@
 # tests/startup.py
 from __future__ import annotations
 
+import os
+
+
 def run_tests_on_startup() -> bool:
     """
     Run pytest before starting the web app.
 
+    Skipped (returns True) when BOB_SKIP_STARTUP_TESTS=1 or
+    FLASK_ENV=production, e.g. where CI has already run the suite.
+
     Returns True if tests pass (or pytest isn't installed),
     False if they fail.
     """
+    if os.getenv("BOB_SKIP_STARTUP_TESTS") == "1" or os.getenv("FLASK_ENV") == "production":
+        print("[GhostFrog] Startup tests skipped (BOB_SKIP_STARTUP_TESTS / FLASK_ENV).")
+        return True
+
     try:
         import pytest
     except ImportError:
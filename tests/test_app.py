@@ -14,6 +14,7 @@ from pathlib import Path
 import os
 
 import pytest
+import smtplib
 import sys
 from pathlib import Path
 
@@ -127,6 +128,28 @@ def test_list_files_recursive(tmp_path, monkeypatch):
     assert "dir1/file2.py" in result
 
 
+def test_list_files_recursive_respects_max_entries(tmp_path, monkeypatch):
+    """
+    Recursive listing stops at max_entries and walks directories in name order.
+    """
+    root = tmp_path / "project"
+    root.mkdir()
+    for d in ("a", "b"):
+        (root / d).mkdir()
+        for i in range(3):
+            (root / d / f"f{i}.txt").write_text("x", encoding="utf-8")
+
+    monkeypatch.setattr(bob_app, "PROJECT_ROOT", root, raising=False)
+    monkeypatch.setattr(bob_app, "SCRATCH_DIR", tmp_path / "scratch", raising=False)
+    bob_app.SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+
+    plan = make_tool_plan("list_files", {"path": ".", "recursive": True, "max_entries": 4})
+    report = bob_app.chad_execute_plan(BASE_ID, BASE_DATE, BASE_NAME, plan)
+
+    lines = (report["tool_result"] or "").splitlines()[1:]
+    assert [line.split()[1] for line in lines] == ["a", "b", "a/f0.txt", "a/f1.txt"]
+
+
 def test_list_files_outside_jail(tmp_path, monkeypatch):
     """
     list_files should refuse to go outside PROJECT_ROOT.
@@ -188,6 +211,29 @@ def test_read_file_nonexistent(tmp_path, monkeypatch):
     assert "does_not_exist" in report["message"]
 
 
+def test_read_file_refuses_directories_and_fifos(tmp_path, monkeypatch):
+    """
+    Non-regular files are reported as such (not as missing), and a FIFO is
+    refused without opening it (which would block with no writer).
+    """
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "subdir").mkdir()
+    if hasattr(os, "mkfifo"):
+        os.mkfifo(root / "pipe")
+
+    monkeypatch.setattr(bob_app, "PROJECT_ROOT", root, raising=False)
+    monkeypatch.setattr(bob_app, "SCRATCH_DIR", tmp_path / "scratch", raising=False)
+    bob_app.SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+
+    names = ["subdir", "pipe"] if hasattr(os, "mkfifo") else ["subdir"]
+    for name in names:
+        plan = make_tool_plan("read_file", {"path": name})
+        report = bob_app.chad_execute_plan(BASE_ID, BASE_DATE, BASE_NAME, plan)
+        assert not report["tool_result"]
+        assert "not a regular file" in report["message"]
+
+
 # ---------------------------------------------------------------------------
 # Markdown notes
 # ---------------------------------------------------------------------------
@@ -309,7 +355,7 @@ def test_send_email_success(monkeypatch, tmp_path):
     It should always send to SMTP_TO / SMTP_TEST_TO, ignoring tool args.
     """
     # Patch SMTP to our dummy
-    monkeypatch.setattr(bob_app.smtplib, "SMTP", _DummySMTP, raising=False)
+    monkeypatch.setattr(smtplib, "SMTP", _DummySMTP, raising=False)
 
     # Set required env vars
     monkeypatch.setenv("SMTP_HOST", "smtp.example.com")
@@ -416,8 +462,8 @@ def test_send_email_forced_to_env(monkeypatch, tmp_path):
         def send_message(self, msg):
             sent["to"] = msg["To"]
 
-    # IMPORTANT: patch THE smtplib INSIDE OUR APP, not global
-    monkeypatch.setattr(bob_app.smtplib, "SMTP", FakeSMTP, raising=False)
+    # send_email imports smtplib on first use, so patch the module itself.
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP, raising=False)
 
     # Minimal required env
     monkeypatch.setenv("SMTP_HOST", "smtp.example.com")
@@ -448,3 +494,446 @@ def test_send_email_forced_to_env(monkeypatch, tmp_path):
 
     # Check that it forced the TO
     assert sent["to"] == "forced@example.com"
+
+
+def test_send_email_auto_attaches_latest_note(monkeypatch, tmp_path):
+    """
+    With no attachments arg, the newest note is attached and previewed.
+    """
+    monkeypatch.setattr(smtplib, "SMTP", _DummySMTP, raising=False)
+    sent = []
+    monkeypatch.setattr(_DummySMTP, "send_message", lambda self, msg: sent.append(msg))
+
+    monkeypatch.setenv("SMTP_HOST", "smtp.example.com")
+    monkeypatch.setenv("SMTP_FROM", "from@example.com")
+    monkeypatch.setenv("SMTP_TO", "forced@example.com")
+
+    root = tmp_path / "project"
+    notes_dir = root / "data" / "notes"
+    notes_dir.mkdir(parents=True)
+    (notes_dir / "today.md").write_text("# Today\n\nRemember the milk.", encoding="utf-8")
+
+    monkeypatch.setattr(bob_app, "PROJECT_ROOT", root, raising=False)
+    monkeypatch.setattr(bob_app, "MARKDOWN_NOTES_DIR", notes_dir, raising=False)
+    monkeypatch.setattr(bob_app, "SCRATCH_DIR", tmp_path / "scratch", raising=False)
+    bob_app.SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+
+    plan = make_tool_plan("send_email", {"body": "see attached"})
+    report = bob_app.chad_execute_plan(BASE_ID, BASE_DATE, BASE_NAME, plan)
+
+    assert "Remember the milk." in (report["tool_result"] or "")
+    attachments = list(sent[0].iter_attachments())
+    assert [a.get_filename() for a in attachments] == ["today.md"]
+    assert b"Remember the milk." in attachments[0].get_payload(decode=True)
+
+
+def test_send_email_attaches_requested_files_in_order(monkeypatch, tmp_path):
+    """
+    Explicit attachments are attached in the order given; missing ones are
+    skipped.
+    """
+    monkeypatch.setattr(smtplib, "SMTP", _DummySMTP, raising=False)
+    sent = []
+    monkeypatch.setattr(_DummySMTP, "send_message", lambda self, msg: sent.append(msg))
+
+    monkeypatch.setenv("SMTP_HOST", "smtp.example.com")
+    monkeypatch.setenv("SMTP_FROM", "from@example.com")
+    monkeypatch.setenv("SMTP_TO", "forced@example.com")
+
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "b.txt").write_bytes(b"bee")
+    (root / "a.csv").write_bytes(b"x,y\n")
+
+    monkeypatch.setattr(bob_app, "PROJECT_ROOT", root, raising=False)
+    monkeypatch.setattr(bob_app, "SCRATCH_DIR", tmp_path / "scratch", raising=False)
+    bob_app.SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+
+    plan = make_tool_plan(
+        "send_email",
+        {"subject": "s", "body": "b", "attachments": ["b.txt", "nope.txt", "a.csv"]},
+    )
+    bob_app.chad_execute_plan(BASE_ID, BASE_DATE, BASE_NAME, plan)
+
+    attachments = list(sent[0].iter_attachments())
+    assert [a.get_filename() for a in attachments] == ["b.txt", "a.csv"]
+    assert [a.get_payload(decode=True) for a in attachments] == [b"bee", b"x,y\n"]
+
+
+def test_send_email_reuses_smtp_connection(monkeypatch, tmp_path):
+    """
+    Consecutive send_email calls share one logged-in SMTP connection while
+    it answers NOOP; a dead connection is replaced transparently.
+    """
+    connections = []
+
+    class PooledSMTP(_DummySMTP):
+        def __init__(self, *a, **kw):
+            super().__init__(*a, **kw)
+            self.alive = True
+            connections.append(self)
+
+        def noop(self):
+            return (250, b"OK") if self.alive else (421, b"closing")
+
+        def quit(self):
+            self.alive = False
+
+    monkeypatch.setattr(smtplib, "SMTP", PooledSMTP, raising=False)
+    monkeypatch.setenv("SMTP_HOST", "smtp.example.com")
+    monkeypatch.setenv("SMTP_USERNAME", "user@example.com")
+    monkeypatch.setenv("SMTP_PASSWORD", "password123")
+    monkeypatch.setenv("SMTP_FROM", "from@example.com")
+    monkeypatch.setenv("SMTP_TO", "forced@example.com")
+
+    root = tmp_path / "project"
+    root.mkdir()
+    monkeypatch.setattr(bob_app, "PROJECT_ROOT", root, raising=False)
+    monkeypatch.setattr(bob_app, "SCRATCH_DIR", tmp_path / "scratch", raising=False)
+    bob_app.SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+
+    plan = make_tool_plan("send_email", {"subject": "s", "body": "b", "attachments": []})
+    for _ in range(2):
+        bob_app.chad_execute_plan(BASE_ID, BASE_DATE, BASE_NAME, plan)
+
+    assert len(connections) == 1
+    assert len(connections[0].sent_messages) == 2
+
+    connections[0].alive = False
+    bob_app.chad_execute_plan(BASE_ID, BASE_DATE, BASE_NAME, plan)
+
+    assert len(connections) == 2
+    assert connections[1].logged_in
+    assert len(connections[1].sent_messages) == 1
+
+
+# ---------------------------------------------------------------------------
+# next_message_id
+# ---------------------------------------------------------------------------
+
+def test_next_message_id_is_unique_under_concurrency(tmp_path, monkeypatch):
+    """
+    Concurrent callers must each get a distinct, consecutive id.
+    """
+    import threading
+
+    seq_file = tmp_path / "seq.txt"
+    seq_file.write_text("41", encoding="utf-8")
+    monkeypatch.setattr(bob_app, "SEQ_FILE", seq_file)
+
+    ids: list[str] = []
+    ids_lock = threading.Lock()
+
+    def worker() -> None:
+        id_str, date_str, base = bob_app.next_message_id()
+        assert base == f"{id_str}_{date_str}"
+        with ids_lock:
+            ids.append(id_str)
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(ids) == [f"{n:05d}" for n in range(42, 62)]
+    assert seq_file.read_text(encoding="utf-8") == "61"
+
+
+# ---------------------------------------------------------------------------
+# codemod
+# ---------------------------------------------------------------------------
+
+def test_codemod_uses_file_contexts_and_sees_earlier_edits(tmp_path, monkeypatch):
+    """
+    Contents passed via file_contexts stand in for the disk read, and a second
+    edit to the same file builds on the first one rather than the stale copy.
+    """
+    root = tmp_path / "project"
+    root.mkdir()
+    target = root / "notes.txt"
+    target.write_text("on disk\n", encoding="utf-8")
+
+    monkeypatch.setattr(bob_app, "PROJECT_ROOT", root, raising=False)
+    monkeypatch.setattr(bob_app, "SCRATCH_DIR", tmp_path / "scratch", raising=False)
+    bob_app.SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+
+    plan = {
+        "task": {
+            "type": "codemod",
+            "summary": "Append two lines",
+            "analysis_file": "",
+            "edits": [
+                {"file": "notes.txt", "operation": "append_to_bottom", "content": "one"},
+                {"file": "./notes.txt", "operation": "append_to_bottom", "content": "two"},
+            ],
+            "tool": {},
+        }
+    }
+    st = target.stat()
+    report = bob_app.chad_execute_plan(
+        BASE_ID, BASE_DATE, BASE_NAME, plan,
+        file_contexts={"notes.txt": "from context\n"},
+        file_stamps={"notes.txt": (st.st_mtime_ns, st.st_size)},
+    )
+
+    assert report["touched_files"] == ["notes.txt", "notes.txt"]
+    assert target.read_text(encoding="utf-8") == "from context\n\none\n\ntwo\n"
+
+
+def test_codemod_rereads_file_changed_since_context_was_read(tmp_path, monkeypatch):
+    """
+    A file saved after its context was read (stamp mismatch), or a context
+    without a stamp, is re-read: the edit must not resurrect the old text.
+    """
+    root = tmp_path / "project"
+    root.mkdir()
+    changed = root / "changed.txt"
+    changed.write_text("old\n", encoding="utf-8")
+    st = changed.stat()
+    changed.write_text("saved meanwhile\n", encoding="utf-8")
+    unstamped = root / "unstamped.txt"
+    unstamped.write_text("disk\n", encoding="utf-8")
+
+    monkeypatch.setattr(bob_app, "PROJECT_ROOT", root, raising=False)
+    monkeypatch.setattr(bob_app, "SCRATCH_DIR", tmp_path / "scratch", raising=False)
+    bob_app.SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+
+    plan = {
+        "task": {
+            "type": "codemod",
+            "summary": "Append",
+            "analysis_file": "",
+            "edits": [
+                {"file": "changed.txt", "operation": "append_to_bottom", "content": "x"},
+                {"file": "unstamped.txt", "operation": "append_to_bottom", "content": "y"},
+            ],
+            "tool": {},
+        }
+    }
+    bob_app.chad_execute_plan(
+        BASE_ID, BASE_DATE, BASE_NAME, plan,
+        file_contexts={"changed.txt": "old\n", "unstamped.txt": "stale\n"},
+        file_stamps={"changed.txt": (st.st_mtime_ns, st.st_size)},
+    )
+
+    assert changed.read_text(encoding="utf-8") == "saved meanwhile\n\nx\n"
+    assert unstamped.read_text(encoding="utf-8") == "disk\n\ny\n"
+
+
+def test_codemod_multi_file_report_keeps_plan_order(tmp_path, monkeypatch):
+    """
+    Edits to different files may run concurrently, but touched_files and
+    edit_logs must still follow the order of the edits in the plan.
+    """
+    root = tmp_path / "project"
+    root.mkdir()
+
+    monkeypatch.setattr(bob_app, "PROJECT_ROOT", root, raising=False)
+    monkeypatch.setattr(bob_app, "SCRATCH_DIR", tmp_path / "scratch", raising=False)
+    bob_app.SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+
+    names = [f"file{n}.txt" for n in range(6)]
+    edits = [
+        {"file": name, "operation": "create_or_overwrite_file", "content": name}
+        for name in names
+    ]
+    edits.insert(3, {"file": "../escape.txt", "operation": "replace", "content": "x"})
+    plan = {
+        "task": {
+            "type": "codemod",
+            "summary": "Create several files",
+            "analysis_file": "",
+            "edits": edits,
+            "tool": {},
+        }
+    }
+    report = bob_app.chad_execute_plan(BASE_ID, BASE_DATE, BASE_NAME, plan)
+
+    assert report["touched_files"] == names
+    assert [log["file"] for log in report["edit_logs"]] == [e["file"] for e in edits]
+    assert report["edit_logs"][3]["reason"] == "target path escapes project jail"
+    for name in names:
+        assert (root / name).read_text(encoding="utf-8") == name
+
+
+def test_next_message_id_sees_external_writes(tmp_path, monkeypatch):
+    """
+    Another process replacing seq.txt (new inode) must not be masked by the
+    in-process cache of the last value we wrote.
+    """
+    seq_file = tmp_path / "seq.txt"
+    monkeypatch.setattr(bob_app, "SEQ_FILE", seq_file)
+
+    assert bob_app.next_message_id()[0] == "00001"
+    assert bob_app.next_message_id()[0] == "00002"
+
+    other = tmp_path / "seq.txt.other"
+    other.write_text("100", encoding="utf-8")
+    os.replace(other, seq_file)
+
+    assert bob_app.next_message_id()[0] == "00101"
+
+
+def test_next_message_ids_reserves_a_consecutive_block(tmp_path, monkeypatch):
+    seq_file = tmp_path / "seq.txt"
+    seq_file.write_text("9", encoding="utf-8")
+    monkeypatch.setattr(bob_app, "SEQ_FILE", seq_file)
+
+    batch = bob_app.next_message_ids(3)
+
+    assert [id_str for id_str, _, _ in batch] == ["00010", "00011", "00012"]
+    assert all(base == f"{id_str}_{date_str}" for id_str, date_str, base in batch)
+    assert bob_app.next_message_id()[0] == "00013"
+
+
+# ---------------------------------------------------------------------------
+# auto repair
+# ---------------------------------------------------------------------------
+
+def test_auto_repair_coalesces_overlapping_requests(monkeypatch):
+    """
+    While a repair child runs, further requests collapse into one follow-up.
+    """
+    launches: list = []
+
+    def fake_spawn(cmd, cwd, *, on_exit=None):
+        launches.append(on_exit)
+
+    monkeypatch.setattr(bob_app, "spawn_background", fake_spawn)
+    monkeypatch.setattr(bob_app, "_repair_running", False)
+    monkeypatch.setattr(bob_app, "_repair_pending", False)
+
+    for _ in range(3):
+        bob_app._auto_repair_then_retry_async()
+    assert len(launches) == 1
+
+    launches[0](None)  # first child exits → one follow-up run
+    assert len(launches) == 2
+
+    launches[1](None)  # follow-up exits with nothing owed
+    assert len(launches) == 2
+
+    bob_app._auto_repair_then_retry_async()
+    assert len(launches) == 3
+
+
+# ---------------------------------------------------------------------------
+# chat blueprint (wired with fakes through ChatDeps)
+# ---------------------------------------------------------------------------
+
+def test_api_chat_round_trip_with_fake_deps(tmp_path):
+    """
+    /api/chat writes the user message, runs plan → exec → answer through the
+    injected callables, and returns the UI messages.
+    """
+    from flask import Flask
+    from web.chat import ChatDeps, create_chat_blueprint
+
+    queue_dir = tmp_path / "queue"
+    queue_dir.mkdir()
+    calls: dict = {}
+
+    def fake_exec(id_str, date_str, base, plan, *, file_contexts=None, file_stamps=None):
+        calls["exec"] = (base, file_contexts)
+        return {"message": "nothing to do", "touched_files": []}
+
+    deps = ChatDeps(
+        chat_template_path=tmp_path / "missing.html",
+        project_root=tmp_path,
+        queue_dir=queue_dir,
+        scratch_dir=tmp_path / "scratch",
+        next_message_id=lambda: ("00007", "2025-11-23", "00007_2025-11-23"),
+        bob_build_plan=lambda *a, **k: {"task": {"type": "chat", "summary": "say hi"}},
+        bob_refine_codemod_with_files=lambda **k: k["base_task"],
+        bob_simple_chat=lambda text: f"echo: {text}",
+        bob_answer_with_context=lambda *a: "",
+        chad_execute_plan=fake_exec,
+        log_history_record=lambda **k: None,
+        auto_repair_fn=lambda: None,
+    )
+    flask_app = Flask(__name__)
+    flask_app.register_blueprint(create_chat_blueprint(deps))
+    client = flask_app.test_client()
+
+    resp = client.post("/api/chat", json={"message": "hello"})
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["task_type"] == "chat"
+    assert any(m["text"] == "echo: hello" for m in body["messages"])
+    assert calls["exec"] == ("00007_2025-11-23", {})
+    assert (queue_dir / "00007_2025-11-23.user.txt").exists()
+
+    page = client.get("/chat")
+    assert b"chat_ui.html is missing" in page.data
+
+
+
+def test_chat_page_recompiles_template_only_when_file_changes(tmp_path, monkeypatch):
+    """GET /chat reuses the compiled template until chat_ui.html changes."""
+    from flask import Flask
+    from web.chat import ChatDeps, create_chat_blueprint
+
+    template_path = tmp_path / "chat_ui.html"
+    template_path.write_text("<p>{{ 1 + 1 }}</p>", encoding="utf-8")
+    deps = ChatDeps(
+        chat_template_path=template_path,
+        project_root=tmp_path,
+        queue_dir=tmp_path,
+        scratch_dir=tmp_path,
+        next_message_id=lambda: ("1", "d", "1_d"),
+        bob_build_plan=lambda *a, **k: {},
+        bob_refine_codemod_with_files=lambda **k: {},
+        bob_simple_chat=lambda text: "",
+        bob_answer_with_context=lambda *a: "",
+        chad_execute_plan=lambda *a, **k: {},
+        log_history_record=lambda **k: None,
+        auto_repair_fn=lambda: None,
+    )
+    flask_app = Flask(__name__)
+    flask_app.register_blueprint(create_chat_blueprint(deps))
+    client = flask_app.test_client()
+
+    compiled = []
+    from_string = flask_app.jinja_env.from_string
+    monkeypatch.setattr(
+        flask_app.jinja_env,
+        "from_string",
+        lambda source: compiled.append(source) or from_string(source),
+    )
+
+    assert client.get("/chat").data == b"<p>2</p>"
+    assert client.get("/chat").data == b"<p>2</p>"
+    assert len(compiled) == 1
+
+    template_path.write_text("<p>{{ 2 + 2 }}!</p>", encoding="utf-8")
+    assert client.get("/chat").data == b"<p>4!</p>"
+    assert len(compiled) == 2
+
+
+def test_history_writer_is_shared_and_drained_at_exit(monkeypatch):
+    """
+    One lazily started worker writes history records in order; the atexit
+    drain runs everything still queued before the process goes away.
+    """
+    import queue
+    import web.chat as web_chat
+
+    monkeypatch.setattr(web_chat, "_history_q", queue.Queue())
+    monkeypatch.setattr(web_chat, "_history_thread", None)
+    registered = []
+    monkeypatch.setattr(web_chat.atexit, "register", registered.append)
+
+    done = []
+    for i in range(50):
+        web_chat._submit_history(lambda i=i: done.append(i))
+    thread = web_chat._history_thread
+
+    assert registered == [web_chat._drain_history]
+    web_chat._drain_history()
+
+    assert done == list(range(50))
+    assert not thread.is_alive()
+    web_chat._submit_history(lambda: done.append("late"))  # after drain: inline
+    assert done[-1] == "late"
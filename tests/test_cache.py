@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Tests for Bob's response caches (bob/cache.py).
+
+These never hit OpenAI: embeddings and clients are faked.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure project root (where app.py lives) is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+root_str = str(ROOT)
+if root_str not in sys.path:
+    sys.path.insert(0, root_str)
+
+from bob import cache as bob_cache  # noqa: E402
+
+
+# ---------------------------------------------------------------------------
+# SemanticCache
+# ---------------------------------------------------------------------------
+
+def test_semantic_cache_hit_and_miss(tmp_path):
+    """
+    A lookup returns the stored response only for a close-enough embedding
+    in the same scope.
+    """
+    cache = bob_cache.SemanticCache("t", threshold=0.9, cache_dir=tmp_path)
+    cache.store("scope-a", [1.0, 0.0], "cached answer")
+
+    assert cache.lookup("scope-a", [1.0, 0.0]) == "cached answer"
+    assert cache.lookup("scope-a", [0.0, 1.0]) is None
+    assert cache.lookup("scope-b", [1.0, 0.0]) is None
+
+
+def test_semantic_cache_persists_and_expires(tmp_path):
+    """
+    Entries survive a reload from disk, but not past their TTL.
+    """
+    cache = bob_cache.SemanticCache("t", cache_dir=tmp_path)
+    cache.store("s", [1.0, 0.0], "answer")
+
+    reloaded = bob_cache.SemanticCache("t", cache_dir=tmp_path)
+    assert reloaded.lookup("s", [1.0, 0.0]) == "answer"
+
+    expired = bob_cache.SemanticCache("t", ttl=0, cache_dir=tmp_path)
+    assert expired.lookup("s", [1.0, 0.0]) is None
+
+
+def test_semantic_cache_drops_expired_and_oldest_entries(tmp_path, monkeypatch):
+    """
+    A long-lived cache forgets entries once they expire, and never holds
+    more than max_entries (the oldest go first).
+    """
+    clock = [1000.0]
+    monkeypatch.setattr(bob_cache.time, "time", lambda: clock[0])
+    cache = bob_cache.SemanticCache("t", ttl=60, max_entries=2, cache_dir=tmp_path)
+
+    cache.store("s", [1.0, 0.0], "first")
+    clock[0] += 30
+    cache.store("s", [0.0, 1.0], "second")
+    clock[0] += 31
+    assert cache.lookup("s", [1.0, 0.0]) is None
+    assert [e["response"] for e in cache._entries] == ["second"]
+
+    cache.store("s", [0.6, 0.8], "third")
+    cache.store("s", [0.8, 0.6], "fourth")
+    assert [e["response"] for e in cache._entries] == ["third", "fourth"]
+    assert cache.lookup("s", [0.0, 1.0]) is None
+    assert cache.lookup("s", [0.8, 0.6]) == "fourth"
+
+
+def test_semantic_cached_decorator_skips_model_on_hit(tmp_path, monkeypatch):
+    """
+    With BOB_SEMANTIC_CACHE=1 the second near-identical call is served from
+    the cache and the wrapped function is not called again.
+    """
+    monkeypatch.setenv("BOB_SEMANTIC_CACHE", "1")
+    monkeypatch.setattr(bob_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(bob_cache, "get_openai_client", lambda: object())
+    monkeypatch.setattr(bob_cache, "embed_text", lambda client, text: [1.0, 0.0])
+
+    calls = []
+
+    @bob_cache.semantic_cached(threshold=0.92)
+    def ask(system_prompt, user_text):
+        calls.append(user_text)
+        return f"answer to {user_text}"
+
+    assert ask("sys", "what time is it") == "answer to what time is it"
+    assert ask("sys", "what time is it?") == "answer to what time is it"
+    assert calls == ["what time is it"]
+
+
+def test_semantic_cached_decorator_disabled_by_default(tmp_path, monkeypatch):
+    """
+    Without BOB_SEMANTIC_CACHE=1 every call goes to the wrapped function.
+    """
+    monkeypatch.delenv("BOB_SEMANTIC_CACHE", raising=False)
+    monkeypatch.setattr(bob_cache, "CACHE_DIR", tmp_path)
+
+    calls = []
+
+    @bob_cache.semantic_cached()
+    def ask(system_prompt, user_text):
+        calls.append(user_text)
+        return "x"
+
+    ask("sys", "hi")
+    ask("sys", "hi")
+    assert calls == ["hi", "hi"]
+
+
+def test_embed_text_coalesces_concurrent_calls():
+    """
+    Calls that arrive while an embeddings request is in flight are sent
+    together in the next one, each caller getting its own (unit) vector.
+    """
+    import threading
+    from types import SimpleNamespace
+
+    first_sent = threading.Event()
+    release = threading.Event()
+    requests = []
+
+    class FakeEmbeddings:
+        def create(self, model, input):
+            requests.append(list(input))
+            if len(requests) == 1:
+                first_sent.set()
+                assert release.wait(timeout=5)
+            data = [
+                SimpleNamespace(index=i, embedding=[float(len(t)), 1.0])
+                for i, t in enumerate(input)
+            ]
+            return SimpleNamespace(data=list(reversed(data)))
+
+    client = SimpleNamespace(embeddings=FakeEmbeddings())
+    batcher = bob_cache._EmbeddingBatcher()
+    results = {}
+
+    def run(text):
+        results[text] = batcher.embed(client, text)
+
+    first = threading.Thread(target=run, args=("a",))
+    first.start()
+    assert first_sent.wait(timeout=5)
+    others = [threading.Thread(target=run, args=(t,)) for t in ("bb", "ccc")]
+    for t in others:
+        t.start()
+    while len(batcher._pending) < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in [first, *others]:
+        t.join(timeout=5)
+
+    assert requests[0] == ["a"]
+    assert sorted(requests[1]) == ["bb", "ccc"]
+    assert len(requests) == 2
+    assert results == {t: bob_cache._unit([len(t), 1]) for t in ("a", "bb", "ccc")}
+
+
+def test_embed_text_fails_callers_missing_from_response():
+    """
+    A response with fewer items than inputs fails the unanswered callers
+    (no hang), and empty text is refused before it can spoil a batch.
+    """
+    import threading
+    from types import SimpleNamespace
+
+    class ShortEmbeddings:
+        def create(self, model, input):
+            return SimpleNamespace(data=[SimpleNamespace(index=0, embedding=[1.0, 0.0])])
+
+    client = SimpleNamespace(embeddings=ShortEmbeddings())
+    batcher = bob_cache._EmbeddingBatcher()
+    batcher._busy = True
+    outcomes = {}
+
+    def run(text):
+        try:
+            outcomes[text] = batcher.embed(client, text)
+        except RuntimeError as e:
+            outcomes[text] = e
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in ("a", "b")]
+    for t in threads:
+        t.start()
+    while len(batcher._pending) < 2:
+        threading.Event().wait(0.01)
+    with batcher._cond:
+        batcher._busy = False
+        batcher._cond.notify_all()
+    for t in threads:
+        t.join(timeout=5)
+        assert not t.is_alive()
+
+    results = sorted(outcomes.values(), key=lambda v: isinstance(v, RuntimeError))
+    assert results[0] == [1.0, 0.0]
+    assert isinstance(results[1], RuntimeError)
+    assert batcher._pending == []
+
+    with pytest.raises(ValueError):
+        batcher.embed(client, "")
+
+
+# ---------------------------------------------------------------------------
+# ExactCache
+# ---------------------------------------------------------------------------
+
+def test_exact_cache_get_set_and_expiry(tmp_path):
+    """
+    Values round-trip through SQLite and are ignored once expired.
+    """
+    cache = bob_cache.ExactCache("t", cache_dir=tmp_path)
+    key = bob_cache.cache_key("model", "sys", "hello")
+
+    assert cache.get(key) is None
+    cache.set(key, "hi there")
+    assert cache.get(key) == "hi there"
+
+    reloaded = bob_cache.ExactCache("t", cache_dir=tmp_path)
+    assert reloaded.get(key) == "hi there"
+
+    cache.set(key, "stale", ttl=-1)
+    assert cache.get(key) is None
+
+
+def test_exact_cached_decorator_only_matches_identical_requests(tmp_path, monkeypatch):
+    """
+    With BOB_EXACT_CACHE=1 a byte-identical request is served from the cache;
+    any change to the prompt goes to the wrapped function.
+    """
+    monkeypatch.setenv("BOB_EXACT_CACHE", "1")
+    monkeypatch.setattr(bob_cache, "CACHE_DIR", tmp_path)
+
+    calls = []
+
+    @bob_cache.exact_cached(ttl=60)
+    def ask(system_prompt, user_text):
+        calls.append(user_text)
+        return f"answer to {user_text}"
+
+    assert ask("sys", "hello") == "answer to hello"
+    assert ask("sys", "hello") == "answer to hello"
+    assert ask("sys", "hello!") == "answer to hello!"
+    assert calls == ["hello", "hello!"]
+
+
+def test_semantic_cached_hit_never_calls_the_model(tmp_path, monkeypatch):
+    """
+    The model is only called after a lookup misses: a hit costs the
+    embedding alone, not a model call whose answer is thrown away.
+    """
+    monkeypatch.setenv("BOB_SEMANTIC_CACHE", "1")
+    monkeypatch.setattr(bob_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(bob_cache, "get_openai_client", lambda: object())
+    events = []
+
+    def fake_embed(client, text):
+        events.append("embed")
+        return [1.0, 0.0]
+
+    monkeypatch.setattr(bob_cache, "embed_text", fake_embed)
+
+    @bob_cache.semantic_cached()
+    def ask(system_prompt, user_text):
+        events.append("model")
+        return "answer"
+
+    assert ask("sys", "hello") == "answer"
+    assert ask("sys", "hello!") == "answer"
+    assert events == ["embed", "model", "embed"]
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for Bob's configuration helpers (bob/config.py).
+
+These never hit OpenAI: a client is built with a dummy key but never used.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure project root (where app.py lives) is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+root_str = str(ROOT)
+if root_str not in sys.path:
+    sys.path.insert(0, root_str)
+
+from bob import config as bob_config  # noqa: E402
+
+
+@pytest.fixture
+def fresh_client_cache():
+    bob_config.get_openai_client.cache_clear()
+    yield
+    bob_config.get_openai_client.cache_clear()
+
+
+def test_get_openai_client_builds_pooled_client(monkeypatch, fresh_client_cache):
+    """
+    With a key configured, the real SDK client and its shared HTTP pool can
+    be built (an import or constructor error here would break every call).
+    """
+    openai = pytest.importorskip("openai")
+    monkeypatch.setattr(bob_config, "HAS_OPENAI_KEY", True)
+    monkeypatch.setattr(bob_config, "OPENAI_API_KEY", "sk-test-dummy")
+
+    client = bob_config.get_openai_client()
+
+    assert isinstance(client, openai.OpenAI)
+    assert client is bob_config.get_openai_client()
+    timeout = client._client.timeout
+    assert (timeout.read, timeout.connect) == (600.0, 5.0)
+
+
+def test_get_openai_client_without_key(monkeypatch, fresh_client_cache):
+    monkeypatch.setattr(bob_config, "HAS_OPENAI_KEY", False)
+    assert bob_config.get_openai_client() is None
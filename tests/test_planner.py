@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Tests for Bob's planner helpers (bob/planner.py).
+
+These never hit OpenAI.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure project root (where app.py lives) is on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+root_str = str(ROOT)
+if root_str not in sys.path:
+    sys.path.insert(0, root_str)
+
+from bob import planner as bob_planner  # noqa: E402
+
+
+# ---------------------------------------------------------------------------
+# parse_plan_json
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ('{"task_type": "chat"}', {"task_type": "chat"}),
+        ('{"a": 1}{"b": 2}', {"a": 1}),
+        ('```json\n{"summary": "use } and { freely"}\n```', {"summary": "use } and { freely"}),
+        ('Here you go: {"edits": [{"file": "x.py"}]} thanks', {"edits": [{"file": "x.py"}]}),
+    ],
+)
+def test_parse_plan_json_extracts_first_object(raw, expected):
+    """
+    Messy model replies still yield the first top-level JSON object.
+    """
+    assert bob_planner.parse_plan_json(raw) == expected
+
+
+def test_parse_plan_json_rejects_non_json():
+    """
+    Replies without a usable object raise ValueError (callers fall back).
+    """
+    with pytest.raises(ValueError):
+        bob_planner.parse_plan_json("no json here")
+    with pytest.raises(ValueError):
+        bob_planner.parse_plan_json('{"unterminated": ')
+
+
+# ---------------------------------------------------------------------------
+# bob_refine_codemod_with_files
+# ---------------------------------------------------------------------------
+
+def test_refine_reuses_cached_task_for_same_inputs(tmp_path, monkeypatch):
+    """
+    With BOB_EXACT_CACHE=1 the same request against the same file contents is
+    refined once; changed contents trigger a new model call.
+    """
+    from bob import cache as bob_cache
+
+    monkeypatch.setenv("BOB_EXACT_CACHE", "1")
+    monkeypatch.setattr(bob_planner, "HAS_OPENAI_KEY", True)
+    monkeypatch.setattr(
+        bob_planner, "_REFINE_CACHE", bob_cache.ExactCache("refine", cache_dir=tmp_path)
+    )
+
+    calls = []
+
+    def fake_refinement(refine_prompt, files_message):
+        calls.append(files_message)
+        return '{"summary": "add docstring", "edits": [{"file": "a.py"}]}'
+
+    monkeypatch.setattr(bob_planner, "_ask_for_refinement", fake_refinement)
+
+    base_task = {"type": "codemod", "summary": "initial", "edits": []}
+    first = bob_planner.bob_refine_codemod_with_files("doc it", base_task, {"a.py": "x = 1\n"})
+    second = bob_planner.bob_refine_codemod_with_files("doc it", base_task, {"a.py": "x = 1\n"})
+    bob_planner.bob_refine_codemod_with_files("doc it", base_task, {"a.py": "x = 2\n"})
+
+    assert first == second
+    assert first["summary"] == "add docstring"
+    assert len(calls) == 2
+
+
+def test_refine_files_message_format(monkeypatch):
+    """Each file is fenced by FILE/END FILE markers, blank line between files."""
+    monkeypatch.delenv("BOB_EXACT_CACHE", raising=False)
+    monkeypatch.setattr(bob_planner, "HAS_OPENAI_KEY", True)
+    seen = []
+
+    def fake_refinement(refine_prompt, files_message):
+        seen.append(files_message)
+        return '{"summary": "s", "edits": []}'
+
+    monkeypatch.setattr(bob_planner, "_ask_for_refinement", fake_refinement)
+
+    bob_planner.bob_refine_codemod_with_files(
+        "x", {"summary": "s"}, {"a.py": "A", "b.py": "B"}
+    )
+
+    assert seen == [
+        "Here are the current file contents you may edit:\n\n"
+        "===== FILE: a.py =====\nA\n===== END FILE =====\n"
+        "\n"
+        "===== FILE: b.py =====\nB\n===== END FILE =====\n"
+    ]
+
+
+def test_system_prompts_share_prefix_up_to_tool_mode():
+    """Only the trailing tool-mode text differs between the two variants."""
+    on = bob_planner._SYSTEM_PROMPT_TOOLS_ON
+    off = bob_planner._SYSTEM_PROMPT_TOOLS_OFF
+    on_at = on.rindex(bob_planner.TOOL_MODE_TEXT_ENABLED)
+    off_at = off.rindex(bob_planner.TOOL_MODE_TEXT_DISABLED)
+
+    assert on[:on_at] == off[:off_at]
+    assert on[on_at:].strip() == bob_planner.TOOL_MODE_TEXT_ENABLED.strip()
+    assert off[off_at:].strip() == bob_planner.TOOL_MODE_TEXT_DISABLED.strip()
+
+
+def test_build_plan_writes_plan_json_in_background(tmp_path, monkeypatch):
+    """plan.json holds the plan as built, even if the caller mutates it later."""
+    monkeypatch.setattr(bob_planner, "HAS_OPENAI_KEY", False)
+
+    plan = bob_planner.bob_build_plan("1", "2025-11-23", "1_2025-11-23", "hi", tmp_path)
+    plan["task"] = {"type": "codemod"}
+    bob_planner._PLAN_WRITER.submit(lambda: None).result()  # drain the writer
+
+    written = json.loads((tmp_path / "1_2025-11-23.plan.json").read_text(encoding="utf-8"))
+    assert written["task"]["type"] == "chat"
+    assert written["raw_user_text"] == "hi"
+
+
+@pytest.mark.parametrize(
+    "text, tool, args",
+    [
+        ("What time is it?", "get_current_datetime", {}),
+        ("what's the date today", "get_current_datetime", {}),
+        ("ls src", "list_files", {"path": "src"}),
+        ("list files in docs/", "list_files", {"path": "docs/"}),
+        ("cat README.md", "read_file", {"path": "README.md"}),
+        ("open ./app.py", "read_file", {"path": "./app.py"}),
+    ],
+)
+def test_fast_route_plans_trivial_tool_requests(text, tool, args, monkeypatch):
+    """Obvious one-tool requests are planned without calling the model."""
+    monkeypatch.setattr(bob_planner, "_ask_for_plan", None)  # must not be called
+
+    plan = bob_planner.bob_build_plan("1", "2025-11-23", "1_2025-11-23", text)
+
+    assert plan["task"]["type"] == "tool"
+    assert plan["task"]["tool"] == {"name": tool, "args": args}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "read app.py and explain it",
+        "read more",
+        "what time should I leave?",
+        "ls -la",
+        "list files in --all",
+        "open ./",
+        "cat src/",
+        "read ../..",
+        "cat -n app.py",
+    ],
+)
+def test_fast_route_leaves_other_requests_to_the_model(text):
+    assert bob_planner._fast_route(text) is None
+
+
+def test_plan_schema_error_with_real_validator():
+    """The compiled validator accepts a tool plan and names what is wrong."""
+    pytest.importorskip("fastjsonschema")
+    from bob.schema import plan_schema_error
+
+    plan = {
+        "task_type": "tool",
+        "summary": "List files",
+        "analysis_file": "",
+        "edits": [],
+        "tool": {"name": "list_files", "args": {"path": "."}},
+    }
+    assert plan_schema_error(plan) is None
+    # Every edit operation the executor implements must validate.
+    for op in ("prepend_comment", "create_or_overwrite_file", "append_to_bottom", "replace"):
+        edit = {"file": "a.py", "operation": op, "content": "x"}
+        assert plan_schema_error(dict(plan, task_type="codemod", edits=[edit])) is None
+
+    bad = dict(plan, tool={"name": "rm_rf", "args": {}})
+    assert "must be one of" in plan_schema_error(bad)
+    missing = {k: v for k, v in plan.items() if k != "edits"}
+    assert "edits" in plan_schema_error(missing)
+
+
+def test_build_plan_retries_once_when_reply_fails_schema(monkeypatch):
+    """A reply that fails schema validation gets one repair round trip."""
+    monkeypatch.setattr(bob_planner, "HAS_OPENAI_KEY", True)
+    prompts = []
+    replies = iter([
+        '{"task_type": "refactor", "summary": "x", "analysis_file": "", "edits": []}',
+        '{"task_type": "chat", "summary": "fixed", "analysis_file": "", "edits": []}',
+    ])
+
+    def fake_ask(system_prompt, user_text):
+        prompts.append(user_text)
+        return next(replies)
+
+    def fake_check(body):
+        return None if body["task_type"] == "chat" else "task_type must be one of enum"
+
+    monkeypatch.setattr(bob_planner, "_ask_for_plan", fake_ask)
+    monkeypatch.setattr(bob_planner, "plan_schema_error", fake_check)
+
+    plan = bob_planner.bob_build_plan("1", "2025-11-23", "1_2025-11-23", "tidy up")
+
+    assert plan["task"]["summary"] == "fixed"
+    assert len(prompts) == 2
+    assert "task_type must be one of enum" in prompts[1]
@@ -1,32 +1,142 @@
 # web/chat.py
 from __future__ import annotations
 
+import atexit
 import json
+import os
+import queue
+import threading
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Callable, Any, Dict, List
-
-from flask import Blueprint, jsonify, request, render_template_string, send_from_directory
-
-
-def create_chat_blueprint(
-    *,
-    chat_template_path: Path,
-    project_root: Path,
-    queue_dir: Path,
-    scratch_dir: Path,
-    next_message_id: Callable[[], tuple[str, str, str]],
-    bob_build_plan: Callable[..., dict],
-    bob_refine_codemod_with_files: Callable[..., dict],
-    bob_simple_chat: Callable[[str], str],
-    bob_answer_with_context: Callable[[str, dict, str], str],
-    chad_execute_plan: Callable[[str, str, str, dict], dict],
-    log_history_record: Callable[..., Any],
-    auto_repair_fn: Callable[[], None],
-) -> Blueprint:
+from typing import Callable, Any, Dict, List, Optional
+
+from flask import (
+    Blueprint,
+    current_app,
+    jsonify,
+    render_template,
+    request,
+    send_from_directory,
+)
+from jinja2 import Template
+
+from helpers.jail import resolve_in_project_jail
+from helpers.text import FileStamp, read_text_files_stamped, read_text_head
+
+
+@dataclass(frozen=True, slots=True)
+class ChatDeps:
+    """Everything the chat blueprint needs from the app, bundled for DI."""
+
+    chat_template_path: Path
+    project_root: Path
+    queue_dir: Path
+    scratch_dir: Path
+    next_message_id: Callable[[], tuple[str, str, str]]
+    bob_build_plan: Callable[..., dict]
+    bob_refine_codemod_with_files: Callable[..., dict]
+    bob_simple_chat: Callable[[str], str]
+    bob_answer_with_context: Callable[[str, dict, str], str]
+    chad_execute_plan: Callable[..., dict]
+    log_history_record: Callable[..., Any]
+    auto_repair_fn: Callable[[], None]
+
+
+# ---------------------------------------------------------------------------
+# History writer
+# ---------------------------------------------------------------------------
+#
+# History records (and any auto-repair they trigger) are written by one
+# background thread, in order, so api_chat can respond first. The thread is
+# shared by every blueprint, started on first use, and drained at exit so
+# queued records are not lost.
+
+_history_q: queue.Queue[Optional[Callable[[], None]]] = queue.Queue()
+_history_lock = threading.Lock()
+_history_thread: Optional[threading.Thread] = None
+
+
+def _run_history_job(job: Callable[[], None]) -> None:
+    try:
+        job()
+    except Exception:  # noqa: BLE001
+        # Never let logging break the chat flow
+        pass
+
+
+def _history_worker() -> None:
+    while True:
+        job = _history_q.get()
+        if job is None:  # drain sentinel from _drain_history()
+            return
+        _run_history_job(job)
+
+
+def _drain_history() -> None:
+    """atexit: let the worker finish everything queued so far, then stop."""
+    with _history_lock:
+        thread = _history_thread
+    if thread is not None and thread.is_alive():
+        _history_q.put(None)
+        thread.join()
+
+
+def _submit_history(job: Callable[[], None]) -> None:
+    global _history_thread
+    with _history_lock:
+        if _history_thread is None:
+            _history_thread = threading.Thread(
+                target=_history_worker, name="bob-history", daemon=True
+            )
+            _history_thread.start()
+            atexit.register(_drain_history)
+        drained = not _history_thread.is_alive()
+        if not drained:
+            _history_q.put(job)
+    if drained:
+        # Worker already stopped (interpreter shutting down): write inline.
+        _run_history_job(job)
+
+
+def create_chat_blueprint(deps: ChatDeps) -> Blueprint:
     """
     Build the 'chat' blueprint, wiring in all non-HTTP dependencies via DI.
     """
+    # Bound to locals once: the handlers then read closure cells rather than
+    # doing an attribute lookup on deps per use.
+    chat_template_path = deps.chat_template_path
+    project_root = deps.project_root
+    queue_dir = deps.queue_dir
+    next_message_id = deps.next_message_id
+    bob_build_plan = deps.bob_build_plan
+    bob_refine_codemod_with_files = deps.bob_refine_codemod_with_files
+    bob_simple_chat = deps.bob_simple_chat
+    bob_answer_with_context = deps.bob_answer_with_context
+    chad_execute_plan = deps.chad_execute_plan
+    log_history_record = deps.log_history_record
+    auto_repair_fn = deps.auto_repair_fn
+
+    # chat_ui.html compiled to a Jinja template, re-read and recompiled only
+    # when its mtime/size change: edits still show up on the next reload,
+    # but a plain GET /chat neither reads nor parses the file.
+    template_cache: Dict[str, Any] = {"key": None, "template": None}
+    template_lock = threading.Lock()
+
+    def load_chat_template() -> Optional[Template]:
+        try:
+            st = os.stat(chat_template_path)
+        except OSError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        with template_lock:
+            if template_cache["key"] != key:
+                template_cache["template"] = current_app.jinja_env.from_string(
+                    chat_template_path.read_text(encoding="utf-8")
+                )
+                template_cache["key"] = key
+            return template_cache["template"]
+
     bp = Blueprint("chat", __name__)
 
     @bp.route("/<path:filename>")
@@ -44,11 +154,10 @@ def create_chat_blueprint(
         """
         Serve the main chat UI from ui/chat_ui.html.
         """
-        if chat_template_path.exists():
-            html = chat_template_path.read_text(encoding="utf-8")
-        else:
-            html = "<h1>GhostFrog Bob/Chad UI</h1><p>chat_ui.html is missing.</p>"
-        return render_template_string(html)
+        template = load_chat_template()
+        if template is None:
+            return "<h1>GhostFrog Bob/Chad UI</h1><p>chat_ui.html is missing.</p>"
+        return render_template(template)
 
     @bp.route("/api/chat", methods=["POST"])
     def api_chat():
@@ -90,28 +199,23 @@ def create_chat_blueprint(
 
         # If Bob planned a codemod, refine with real file contents
         task = plan.get("task") or {}
+        file_contexts: dict[str, str] = {}
+        file_stamps: dict[str, FileStamp] = {}
         if task.get("type") == "codemod":
             original_edits = task.get("edits") or []
-            files_for_context: set[str] = set()
+            # Plan order, de-duplicated (a set would shuffle the files blob
+            # between identical requests and defeat the refine caches).
+            files_for_context: dict[str, Path] = {}
             for e in original_edits:
                 rel = e.get("file")
-                if rel:
-                    files_for_context.add(rel)
-
-            file_contexts: dict[str, str] = {}
-            for rel in files_for_context:
-                target = (project_root / rel).resolve()
-                try:
-                    target.relative_to(project_root)
-                except ValueError:
-                    continue
-                if not target.exists() or not target.is_file():
+                if not rel or rel in files_for_context:
                     continue
-                try:
-                    raw = target.read_text(encoding="utf-8")
-                except Exception:
-                    continue
-                file_contexts[rel] = raw
+                target = resolve_in_project_jail(rel, project_root)
+                if target is not None:
+                    files_for_context[rel] = target
+
+            # Read concurrently; missing/unreadable files are simply omitted.
+            file_contexts, file_stamps = read_text_files_stamped(files_for_context)
 
             if file_contexts:
                 refined_task = bob_refine_codemod_with_files(
@@ -122,7 +226,16 @@ def create_chat_blueprint(
                 plan["task"] = refined_task
                 task = refined_task  # keep in sync
 
-        exec_report = chad_execute_plan(id_str, date_str, base, plan)
+        # Hand over the files we read (with their stamps) so Chad can skip
+        # re-reading the ones that are still unchanged on disk.
+        exec_report = chad_execute_plan(
+            id_str,
+            date_str,
+            base,
+            plan,
+            file_contexts=file_contexts,
+            file_stamps=file_stamps,
+        )
 
         # Common task info
         task = plan.get("task") or {}
@@ -242,13 +355,13 @@ def create_chat_blueprint(
 
                 first_rel = touched_files[0]
                 try:
-                    target_path = (project_root / first_rel).resolve()
-                    target_path.relative_to(project_root)
-                    content = target_path.read_text(encoding="utf-8")
-                    if len(content) > 16000:
-                        snippet = content[:16000] + "\n\n... (truncated)"
-                    else:
-                        snippet = content
+                    target_path = resolve_in_project_jail(first_rel, project_root)
+                    if target_path is None:
+                        raise ValueError(f"{first_rel!r} escapes project jail")
+                    # Preview only: read the first 16k characters, not the file.
+                    snippet, truncated = read_text_head(target_path, 16000)
+                    if truncated:
+                        snippet += "\n\n... (truncated)"
                     ui_messages.append(
                         {
                             "role": "bob",
@@ -273,9 +386,10 @@ def create_chat_blueprint(
             )
 
         # --------------------------------------------------------------
-        # Unified history logging for ALL job types
+        # Unified history logging for ALL job types (off the request path;
+        # auto-repair runs after the record it reads has been written)
         # --------------------------------------------------------------
-        try:
+        def record_history() -> None:
             result_label = "success"
             tests_label = "not_run"
             error_summary = None
@@ -347,9 +461,7 @@ def create_chat_blueprint(
             if result_label != "success":
                 auto_repair_fn()
 
-        except Exception:
-            # Never let logging break the chat flow
-            pass
+        _submit_history(record_history)
 
         # <-- IMPORTANT: include touched_files + task_type so the browser can decide to reload
         return jsonify(